@@ -16,6 +16,7 @@ import tempfile
 import shutil
 import sys
 import plistlib
+from concurrent.futures import ThreadPoolExecutor
 
 class ACPIGuru:
     def __init__(self, dsdt_instance=None, smbios_instance=None, run_instance=None, utils_instance=None):
@@ -83,6 +84,9 @@ class ACPIGuru:
         self.target_irqs = [0, 2, 8, 11]
         self.illegal_names = ("XHC1", "EHC1", "EHC2", "PXSX")
         self.dsdt_patches = []
+        # SSDTs waiting on compile_queued_ssdts() - None when compiling immediately
+        self.ssdt_queue = None
+        self.compile_workers = max(1, min(os.cpu_count() or 1, 8))
 
     def get_unique_name(self,name,target_folder,name_append="-Patched"):
         # Get a new file name in the Results folder so we don't override the original
@@ -1199,12 +1203,15 @@ DefinitionBlock ("", "SSDT", 2, "ZPSS", "RTCAWAC", 0x00000000)
         #self.patch_warn()
         #self.u.grab("Press [enter] to return...")
         
-        if self.write_ssdt(ssdt_name, ssdt):
+        # The patches are only returned if the SSDT compiles, so this one
+        # can't wait for the batch compile stage
+        ssdt_compiled = self.write_ssdt(ssdt_name, ssdt, defer=False)
+        if ssdt_compiled:
             return {
                 "Add": [
                     {
                         "Comment": ssdt_name + ".aml | SimpleKaruzi",
-                        "Enabled": self.write_ssdt(ssdt_name, ssdt),
+                        "Enabled": ssdt_compiled,
                         "Path": ssdt_name + ".aml"
                     }
                 ],
@@ -1443,9 +1450,8 @@ DefinitionBlock ("", "SSDT", 2, "ZPSS", "EC", 0x00001000)
         else:
             return plistlib.Data(data+b"\x00"*(max(pad_to-len(data),0)))
 
-    def write_ssdt(self, ssdt_name, ssdt_content, compile=True):
+    def write_ssdt(self, ssdt_name, ssdt_content, compile=True, defer=True):
         dsl_path = os.path.join(self.acpi_directory, ssdt_name + ".dsl")
-        aml_path = os.path.join(self.acpi_directory, ssdt_name + ".aml")
 
         if not os.path.exists(self.acpi_directory):
             os.makedirs(self.acpi_directory)
@@ -1455,17 +1461,71 @@ DefinitionBlock ("", "SSDT", 2, "ZPSS", "EC", 0x00001000)
 
         if not compile:
             return False
-        
+
+        if defer and self.ssdt_queue is not None:
+            # Batch mode - compile_queued_ssdts() builds it and reports
+            # whether it actually compiled
+            self.ssdt_queue[ssdt_name] = ssdt_content
+            return True
+
+        return self._compile_ssdt(ssdt_name, ssdt_content)
+
+    def _compile_ssdt(self, ssdt_name, ssdt_content):
+        dsl_path = os.path.join(self.acpi_directory, ssdt_name + ".dsl")
+        aml_path = os.path.join(self.acpi_directory, ssdt_name + ".aml")
+
+        # Reuse the previous build's .aml if this exact DSL was compiled before
+        cache_key = None
+        try:
+            cache_key = self.acpi.cache.get_key(
+                self.acpi.cache.hash_table(ssdt_content.encode()),
+                self.acpi.get_iasl_version(),
+                context="compile"
+            )
+            aml_data = self.acpi.cache.get_compiled(cache_key)
+            if aml_data:
+                with open(aml_path,"wb") as f:
+                    f.write(aml_data)
+                os.remove(dsl_path)
+                return True
+        except Exception as e:
+            self.utils.log_message("[ACPI GURU] Compiled SSDT cache unavailable for {}: {}".format(ssdt_name, e), level="WARNING")
+
         output = self.run({
-            "args":[self.acpi.iasl, dsl_path]
+            "args":[self.acpi.iasl, dsl_path],
+            "callback":self.acpi._log_iasl_output
         })
         
         if output[-1] != 0:
+            self.utils.log_message("[ACPI GURU] Failed to compile {}: {}".format(ssdt_name, (output[1] or output[0]).strip()), level="ERROR")
             return False
         else:
             os.remove(dsl_path)
-        
-        return os.path.exists(aml_path)
+
+        if not os.path.exists(aml_path):
+            return False
+
+        if cache_key:
+            with open(aml_path,"rb") as f:
+                self.acpi.cache.put_compiled(cache_key, f.read())
+        return True
+
+    def begin_ssdt_batch(self):
+        # Queue SSDTs from write_ssdt() instead of compiling them one by one
+        self.ssdt_queue = {}
+
+    def compile_queued_ssdts(self):
+        # Compiles every queued SSDT across a bounded pool of iasl processes and
+        # returns a dict of ssdt_name -> whether it compiled
+        queue = self.ssdt_queue or {}
+        self.ssdt_queue = None
+        if not queue:
+            return {}
+
+        ssdt_names = list(queue)
+        with ThreadPoolExecutor(max_workers=min(self.compile_workers, len(ssdt_names))) as executor:
+            results = list(executor.map(lambda name: self._compile_ssdt(name, queue[name]), ssdt_names))
+        return dict(zip(ssdt_names, results))
 
     def apply_acpi_patches(self, acpi_patches):
         acpi_patches = [
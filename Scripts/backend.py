@@ -18,6 +18,9 @@ from Scripts import settings
 from Scripts import utils
 from Scripts import integrity_checker
 from Scripts import resource_fetcher
+from Scripts import progress_channel
+from Scripts import mirror_manager
+from Scripts import efi_assembler
 from Scripts import github
 from Scripts import wifi_profile_extractor
 from Scripts import dsdt
@@ -35,6 +38,7 @@ class LogSignalHandler(logging.Handler):
 class Backend(QObject):
     log_message_signal = pyqtSignal(str, str, bool)
     update_status_signal = pyqtSignal(str, str)
+    download_progress_signal = pyqtSignal(object)
     
     def __init__(self):
         super().__init__()
@@ -48,9 +52,19 @@ class Backend(QObject):
         
         self.integrity_checker = integrity_checker.IntegrityChecker(utils_instance=self.u)
         
+        # 下载进度不写入构建日志，而是以合并后的事件通过信号更新进度控件
+        self.progress_channel = progress_channel.ProgressChannel()
+        self.progress_channel.subscribe(self.download_progress_signal.emit)
+        
         self.resource_fetcher = resource_fetcher.ResourceFetcher(
             utils_instance=self.u,
-            integrity_checker_instance=self.integrity_checker
+            integrity_checker_instance=self.integrity_checker,
+            metadata_cache_ttl=self.settings.get("metadata_cache_ttl"),
+            progress_channel_instance=self.progress_channel,
+            mirror_manager_instance=mirror_manager.MirrorManager(
+                utils_instance=self.u,
+                rules=self.settings.get("download_mirrors")
+            )
         )
         self.github = github.Github(
             utils_instance=self.u,
@@ -62,10 +76,16 @@ class Backend(QObject):
             run_instance=self.r,
             utils_instance=self.u
         )
-        self.k = kext_maestro.KextMaestro(utils_instance=self.u)
+        self.efi_assembler = efi_assembler.EFIAssembler(utils_instance=self.u)
+        self.k = kext_maestro.KextMaestro(
+            utils_instance=self.u,
+            integrity_checker_instance=self.integrity_checker,
+            efi_assembler_instance=self.efi_assembler
+        )
         self.c = compatibility_checker.CompatibilityChecker(
             utils_instance=self.u,
-            settings_instance=self.settings
+            settings_instance=self.settings,
+            kext_index_instance=self.k.kext_index
         )
         self.h = hardware_customizer.HardwareCustomizer(utils_instance=self.u)
         self.v = report_validator.ReportValidator(utils_instance=self.u)
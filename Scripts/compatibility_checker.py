@@ -6,14 +6,28 @@ from Scripts import utils
 from Scripts import settings
 
 class CompatibilityChecker:
-    def __init__(self, utils_instance=None, settings_instance=None):
+    def __init__(self, utils_instance=None, settings_instance=None, kext_index_instance=None):
         self.utils = utils_instance if utils_instance else utils.Utils()
         self.settings = settings_instance if settings_instance else settings.Settings()
+        # Optional - without it only the devices listed in pci_data are known
+        self.kext_index = kext_index_instance
+        self.device_kexts = {}
         self.error_codes = []
 
     def is_low_end_intel_cpu(self, processor_name):
         return any(cpu_branding in processor_name for cpu_branding in ("Celeron", "Pentium"))
 
+    def get_matched_kext_compatibility(self, device_id):
+        # Devices pci_data doesn't list yet are supported by the kexts in
+        # OCK_Files that match them, on the macOS versions those kexts support
+        kexts = self.device_kexts.get(device_id)
+        if not kexts:
+            return None
+
+        max_version = max(kexts, key=lambda kext: kext.darwin_range.max_version).max_darwin_version
+        min_version = min(kexts, key=lambda kext: kext.darwin_range.min_version).min_darwin_version
+        return (max_version, min_version)
+
     def check_cpu_compatibility(self):
         max_version = os_data.get_latest_darwin_version()
         min_version = os_data.get_lowest_darwin_version()
@@ -192,6 +206,8 @@ class CompatibilityChecker:
                 device_props["Compatibility"] = (max_version, min_version)
             elif device_id in pci_data.EthernetIDs + pci_data.WirelessUSBIDs:
                 device_props["Compatibility"] = (max_version, min_version)
+            elif self.get_matched_kext_compatibility(device_id):
+                device_props["Compatibility"] = self.get_matched_kext_compatibility(device_id)
 
             if bus_type.startswith("PCI") and not device_props.get("Compatibility"):
                 device_props["Compatibility"] = (None, None)
@@ -231,6 +247,8 @@ class CompatibilityChecker:
                 max_version = "20.99.99"
             elif device_id in pci_data.BluetoothIDs:
                 pass
+            elif self.get_matched_kext_compatibility(device_id):
+                max_version, min_version = self.get_matched_kext_compatibility(device_id)
             else:
                 max_version = min_version = None
 
@@ -246,6 +264,8 @@ class CompatibilityChecker:
             if device_id in pci_data.RealtekCardReaderIDs:
                 if device_id in pci_data.RealtekCardReaderIDs[:5]:
                     max_version = "23.99.99"                
+            elif self.get_matched_kext_compatibility(device_id):
+                max_version, min_version = self.get_matched_kext_compatibility(device_id)
             else:
                 max_version = min_version = None
 
@@ -258,6 +278,15 @@ class CompatibilityChecker:
 
         self.utils.log_message("[COMPATIBILITY CHECKER] Starting compatibility check...", level="INFO")
 
+        # One lookup for every network, Bluetooth and SD controller device in the report
+        self.device_kexts = {}
+        if self.kext_index:
+            self.kext_index.refresh()
+            self.device_kexts = self.kext_index.find_device_kexts(
+                [device_props.get("Device ID") for device_type in ("Network", "Bluetooth", "SD Controller") for device_props in self.hardware_report.get(device_type, {}).values()],
+                categories=("Wi-Fi", "Ethernet", "Bluetooth", "Card Reader")
+            )
+
         steps = [
             ('CPU', self.check_cpu_compatibility),
             ('GPU', self.check_gpu_compatibility),
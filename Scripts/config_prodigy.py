@@ -49,7 +49,7 @@ class ConfigProdigy:
         booter_patch = []
 
         mac_device = mac_model_data.get_mac_device_by_name(smbios_model)
-        if not self.utils.parse_darwin_version(mac_device.initial_support) <= self.utils.parse_darwin_version(macos_version) <= self.utils.parse_darwin_version(mac_device.last_supported_version):
+        if not macos_version in mac_device.support_range:
             booter_patch.append({
                 "Arch": "x86_64",
                 "Comment": "Skip Board ID check",
@@ -460,7 +460,7 @@ class ConfigProdigy:
             if not kext.checked:
                 continue
 
-            if "Lilu" in kext.requires_kexts and not self.utils.parse_darwin_version(kext.min_darwin_version) <= self.utils.parse_darwin_version(macos_version) <= self.utils.parse_darwin_version(kext.max_darwin_version):
+            if "Lilu" in kext.requires_kexts and not macos_version in kext.darwin_range:
                 if not "-lilubetaall" in boot_args:
                     boot_args.append("-lilubetaall")
 
@@ -0,0 +1,60 @@
+class DarwinVersion(tuple):
+    """
+    A parsed "major.minor.patch" Darwin version. It is a plain tuple of ints,
+    so it hashes and compares like the tuples parse_darwin_version used to
+    return. parse() hands out one shared instance per version, so each
+    version string is only split once per session.
+    """
+    __slots__ = ()
+    _interned = {}
+
+    def __new__(cls, version):
+        return cls.parse(version)
+
+    @classmethod
+    def parse(cls, version):
+        if isinstance(version, cls):
+            return version
+
+        darwin_version = cls._interned.get(version)
+        if darwin_version is None:
+            if isinstance(version, str):
+                major, minor, patch = map(int, version.split("."))
+            else:
+                major, minor, patch = map(int, version)
+            key = (major, minor, patch)
+            darwin_version = cls._interned.get(key)
+            if darwin_version is None:
+                darwin_version = cls._interned.setdefault(key, tuple.__new__(cls, key))
+            cls._interned[version] = darwin_version
+        return darwin_version
+
+    def __reduce__(self):
+        # Copies and unpickled values go through parse() too
+        return (DarwinVersion, (tuple(self),))
+
+    def __str__(self):
+        return "{}.{}.{}".format(*self)
+
+    def __repr__(self):
+        return "DarwinVersion('{}')".format(self)
+
+class DarwinRange:
+    """The Darwin versions from min_version to max_version, both included"""
+    __slots__ = ("min_version", "max_version")
+
+    def __init__(self, min_version, max_version):
+        self.min_version = DarwinVersion.parse(min_version)
+        self.max_version = DarwinVersion.parse(max_version)
+
+    def __contains__(self, version):
+        return self.min_version <= DarwinVersion.parse(version) <= self.max_version
+
+    def __eq__(self, other):
+        return isinstance(other, DarwinRange) and (self.min_version, self.max_version) == (other.min_version, other.max_version)
+
+    def __hash__(self):
+        return hash((self.min_version, self.max_version))
+
+    def __repr__(self):
+        return "DarwinRange('{}', '{}')".format(self.min_version, self.max_version)
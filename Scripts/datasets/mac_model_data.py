@@ -1,4 +1,5 @@
 from Scripts.datasets import os_data
+from Scripts.darwin_version import DarwinRange
 
 class MacDevice:
     def __init__(self, name, cpu, cpu_generation, discrete_gpu, initial_support, last_supported_version = None):
@@ -8,6 +9,7 @@ class MacDevice:
         self.discrete_gpu = discrete_gpu
         self.initial_support = initial_support
         self.last_supported_version = last_supported_version or os_data.get_latest_darwin_version()
+        self.support_range = DarwinRange(self.initial_support, self.last_supported_version)
 
 mac_devices = [
     # iMac Models
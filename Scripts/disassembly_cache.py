@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import hashlib
+import platform
+from Scripts import utils
+
+# Part of every key - bump it whenever the post-processing in DSDT.load or the
+# layout of an entry changes, so listings written by older builds are not reused
+CACHE_FORMAT_VERSION = 1
+
+class DisassemblyCache:
+    def __init__(self, utils_instance=None, cache_dir=None, max_size=256 * 1024 * 1024):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.cache_dir = cache_dir if cache_dir else self._get_default_cache_dir()
+        # Upper bound (in bytes) for everything stored in the cache folder -
+        # least recently used entries are evicted once it is exceeded
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def _get_default_cache_dir(self):
+        if getattr(sys, 'frozen', False):
+            app_name = "SimpleKaruzi"
+            if platform.system() == "Windows":
+                base_dir = os.environ.get("APPDATA", os.path.expanduser("~"))
+            elif platform.system() == "Darwin":
+                base_dir = os.path.expanduser("~/Library/Application Support")
+            else:
+                base_dir = os.path.expanduser("~/.config")
+
+            return os.path.join(base_dir, app_name, "ACPI_Cache")
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "ACPI_Cache")
+
+    def hash_table(self, table_bytes):
+        return hashlib.sha256(table_bytes).hexdigest()
+
+    def get_key(self, table_hash, iasl_version, context=""):
+        # The key covers the table itself, the disassembler that produced the
+        # listing and any context (i.e. the other tables used to resolve
+        # externals) that can change what the listing looks like
+        key = hashlib.sha256()
+        key.update(str(CACHE_FORMAT_VERSION).encode() + b"\x00")
+        key.update(str(table_hash).encode())
+        key.update(b"\x00" + str(iasl_version).encode())
+        key.update(b"\x00" + str(context).encode())
+        return key.hexdigest()
+
+    def _entry_path(self, key, extension=".json"):
+        return os.path.join(self.cache_dir, key + extension)
+
+    def get(self, key):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+            # Touch the entry so LRU eviction sees it as recently used
+            os.utime(entry_path, None)
+        except Exception:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {
+            "table": entry["table"],
+            "lines": entry["table"].split("\n"),
+            "scopes": [tuple(x) for x in entry["scopes"]],
+            "paths": [tuple(x) for x in entry["paths"]]
+        }
+
+    def put(self, key, table_data):
+        entry = {
+            "table": table_data.get("table", ""),
+            "scopes": table_data.get("scopes", []),
+            "paths": table_data.get("paths", [])
+        }
+        entry_path = self._entry_path(key)
+        try:
+            self.utils.create_folder(self.cache_dir)
+            temp_path = entry_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(temp_path, entry_path)
+        except Exception as e:
+            self.utils.log_message("[ACPI CACHE] Failed to write cache entry {}: {}".format(key, e), level="WARNING")
+            return False
+
+        self.evict()
+        return True
+
+    def get_compiled(self, key):
+        # Compiled SSDTs are stored as-is next to the disassembly entries
+        entry_path = self._entry_path(key, ".aml")
+        try:
+            with open(entry_path, "rb") as f:
+                aml_data = f.read()
+            os.utime(entry_path, None)
+        except Exception:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return aml_data
+
+    def put_compiled(self, key, aml_data):
+        entry_path = self._entry_path(key, ".aml")
+        try:
+            self.utils.create_folder(self.cache_dir)
+            temp_path = entry_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(aml_data)
+            os.replace(temp_path, entry_path)
+        except Exception as e:
+            self.utils.log_message("[ACPI CACHE] Failed to write compiled entry {}: {}".format(key, e), level="WARNING")
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith((".json", ".aml")):
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        # Oldest access first
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".json", ".aml", ".tmp")):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -1,17 +1,21 @@
 # Original source: https://github.com/corpnewt/SSDTTime/blob/64446d553fcbc14a4e6ebf3d8d16e3357b5cbf50/Scripts/dsdt.py
 
-import os, errno, tempfile, shutil, plistlib, sys, binascii, zipfile, getpass, re
+import os, errno, tempfile, shutil, plistlib, sys, binascii, zipfile, getpass, re, hashlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from Scripts import disassembly_cache
 from Scripts import github
 from Scripts import resource_fetcher
 from Scripts import run
 from Scripts import utils
 
 class DSDT:
-    def __init__(self, utils_instance=None, github_instance=None, resource_fetcher_instance=None, run_instance=None):
+    def __init__(self, utils_instance=None, github_instance=None, resource_fetcher_instance=None, run_instance=None, disassembly_cache_instance=None):
         self.u = utils_instance if utils_instance else utils.Utils()
         self.github = github_instance if github_instance else github.Github()
         self.fetcher = resource_fetcher_instance if resource_fetcher_instance else resource_fetcher.ResourceFetcher()
         self.r = run_instance if run_instance else run.Run()
+        self.cache = disassembly_cache_instance if disassembly_cache_instance else disassembly_cache.DisassemblyCache(utils_instance=self.u)
         
         if getattr(sys, 'frozen', False):
             base_path = os.path.dirname(sys.executable)
@@ -40,7 +44,11 @@ class DSDT:
             self.script_dir = os.path.dirname(os.path.realpath(__file__))
 
         self.h = {} 
+        # Last occurrence lookup done by get_unique_pad - get_shortest_unique_pad
+        # searches the same bytes in up to three directions
+        self._occurrence_cache = (None,None,[])
         self.iasl = self.check_iasl()
+        self.iasl_version = None
         
         if not self.iasl:
             raise Exception(f"Could not locate iasl! Please ensure iasl executable is in: {self.script_dir}")
@@ -48,9 +56,24 @@ class DSDT:
         self.allowed_signatures = (b"APIC",b"DMAR",b"DSDT",b"SSDT")
         self.mixed_listing      = (b"DSDT",b"SSDT")
         self.acpi_tables = {}
+        # Max number of iasl processes to run at once when disassembling
+        # multiple DSDT/SSDTs - set to 1 to force the serial behavior
+        self.disassembly_workers = max(1, min(os.cpu_count() or 1, 8))
         # Setup regex matches
         self.hex_match  = re.compile(r"^\s*[0-9A-F]{4,}:(\s[0-9A-F]{2})+(\s+\/\/.*)?$")
         self.type_match = re.compile(r".*(?P<type>Processor|Scope|Device|Method|Name) \((?P<name>[^,\)]+).*")
+        self.iasl_message_match = re.compile(r"^\s*(?P<level>Error|Warning)\s+\d+")
+
+    def _log_iasl_output(self, line, stream):
+        # Logs each line iasl prints as it arrives - only its errors and
+        # warnings go to the build log, the rest would flood it
+        if not line.strip():
+            return
+        message = self.iasl_message_match.match(line)
+        if message:
+            self.u.log_message("[DSDT] iasl: {}".format(line.strip()), level=message.group("level").upper(), to_build_log=True)
+        else:
+            self.u.log_message("[DSDT] iasl: {}".format(line.rstrip()), level="DEBUG")
 
     def _table_signature(self, table_path, table_name = None):
         path = os.path.join(table_path,table_name) if table_name else table_path
@@ -141,24 +164,36 @@ class DSDT:
             # Generate and run a command
             dsdt_or_ssdt = [x for x in list(target_files) if self._table_signature(temp,x) in self.mixed_listing]
             other_tables = [x for x in list(target_files) if not x in dsdt_or_ssdt]
+            # Check the cache for any tables we've already disassembled - the
+            # DSDT/SSDTs resolve externals against each other, so their keys
+            # include the set they were loaded with
+            cache_keys = self._get_cache_keys(temp,dsdt_or_ssdt,other_tables)
+            cached = {}
+            for x in target_files:
+                entry = self.cache.get(cache_keys[x]) if cache_keys.get(x) else None
+                if entry: cached[x] = entry
+            mixed_tables = list(dsdt_or_ssdt)
+            dsdt_or_ssdt = [x for x in dsdt_or_ssdt if not x in cached]
+            other_tables = [x for x in other_tables if not x in cached]
             out_d = ("","",0)
             out_t = ("","",0)
 
             def exists(folder_path,file_name):
                 # Helper to make sure the file exists and has a non-Zero size
-                check_path = os.path.join(folder_path,file_name)
-                if os.path.isfile(check_path) and os.stat(check_path).st_size > 0:
-                    return True
-                return False
+                return self._disassembled_exists(folder_path,file_name)
             
             # Check our DSDT and SSDTs first
-            if dsdt_or_ssdt:
+            if dsdt_or_ssdt and self.disassembly_workers > 1 and len(dsdt_or_ssdt) > 1:
+                # Spread the tables across a bounded pool of iasl processes - cached
+                # SSDTs are still used to resolve externals
+                failed.extend(self._disassemble_concurrently(temp,dsdt_or_ssdt,target_files,externals=mixed_tables))
+            elif dsdt_or_ssdt:
                 args = [self.iasl,"-da","-dl","-l"]+list(dsdt_or_ssdt)
-                out_d = self.r.run({"args":args})
+                out_d = self.r.run({"args":args,"callback":self._log_iasl_output})
                 if out_d[2] != 0:
                     # Attempt to run without `-da` if the above failed
                     args = [self.iasl,"-dl","-l"]+list(dsdt_or_ssdt)
-                    out_d = self.r.run({"args":args})
+                    out_d = self.r.run({"args":args,"callback":self._log_iasl_output})
                 # Get a list of disassembled names that failed
                 fail_temp = []
                 for x in dsdt_or_ssdt:
@@ -167,13 +202,13 @@ class DSDT:
                 # Let's try to disassemble any that failed individually
                 for x in fail_temp:
                     args = [self.iasl,"-dl","-l",x]
-                    self.r.run({"args":args})
+                    self.r.run({"args":args,"callback":self._log_iasl_output})
                     if not exists(temp,target_files[x]["disassembled_name"]):
                         failed.append(x)
             # Check for other tables (DMAR, APIC, etc)
             if other_tables:
                 args = [self.iasl]+list(other_tables)
-                out_t = self.r.run({"args":args})
+                out_t = self.r.run({"args":args,"callback":self._log_iasl_output})
                 # Get a list of disassembled names that failed
                 for x in other_tables:
                     if not exists(temp,target_files[x]["disassembled_name"]):
@@ -185,82 +220,26 @@ class DSDT:
             for file in target_files:
                 # We need to load the .aml and .dsl into memory
                 # and get the paths and scopes
-                if not exists(temp,target_files[file]["disassembled_name"]):
+                if file in cached:
+                    # Already post-processed - only the raw bytes and header are needed
+                    target_files[file].update(cached[file])
+                elif exists(temp,target_files[file]["disassembled_name"]):
+                    target_files[file]["table"] = self._read_disassembled(os.path.join(temp,target_files[file]["disassembled_name"]))
+                    target_files[file]["lines"] = target_files[file]["table"].split("\n")
+                    # Walk the lines once to gather both scopes and paths
+                    target_files[file]["scopes"],target_files[file]["paths"] = self.parse_namespace(table=target_files[file])
+                else:
                     to_remove.append(file)
                     continue
-                with open(os.path.join(temp,target_files[file]["disassembled_name"]),"r") as f:
-                    target_files[file]["table"] = f.read()
-                    # Remove the compiler info at the start
-                    if target_files[file]["table"].startswith("/*"):
-                        target_files[file]["table"] = "*/".join(target_files[file]["table"].split("*/")[1:]).strip()
-                    # Check for "Table Header:" or "Raw Table Data: Length" and strip everything
-                    # after the last occurrence
-                    for h in ("\nTable Header:","\nRaw Table Data: Length"):
-                        if h in target_files[file]["table"]:
-                            target_files[file]["table"] = h.join(target_files[file]["table"].split(h)[:-1]).rstrip()
-                            break # Bail on the first match
-                    target_files[file]["lines"] = target_files[file]["table"].split("\n")
-                    target_files[file]["scopes"] = self.get_scopes(table=target_files[file])
-                    target_files[file]["paths"] = self.get_paths(table=target_files[file])
                 with open(os.path.join(temp,file),"rb") as f:
-                    table_bytes = f.read()
-                    target_files[file]["raw"] = table_bytes
-                    # Let's read the table header and get the info we need
-                    #
-                    # [0:4]   = Table Signature
-                    # [4:8]   = Length (little endian)
-                    # [8]     = Compliance Revision
-                    # [9]     = Checksum
-                    # [10:16] = OEM ID (6 chars, padded to the right with \x00)
-                    # [16:24] = Table ID (8 chars, padded to the right with \x00)
-                    # [24:28] = OEM Revision (little endian)
-                    # 
-                    target_files[file]["signature"] = table_bytes[0:4]
-                    target_files[file]["revision"]  = table_bytes[8]
-                    target_files[file]["oem"]       = table_bytes[10:16]
-                    target_files[file]["id"]        = table_bytes[16:24]
-                    target_files[file]["oem_revision"] = int(binascii.hexlify(table_bytes[24:28][::-1]),16)
-                    target_files[file]["length"]    = len(table_bytes)
-                    # Get the printable versions of the sig, oem, and id as needed
-                    for key in ("signature","oem","id"):
-                        unprintable,ascii_string = self.get_ascii_print(target_files[file][key])
-                        if unprintable:
-                            target_files[file][key+"_ascii"] = ascii_string
-                    # Cast as int on py2, and try to decode bytes to strings on py3
-                    if 2/3==0:
-                        target_files[file]["revision"] = int(binascii.hexlify(target_files[file]["revision"]),16)
-                # The disassembler omits the last line of hex data in a mixed listing
-                # file... convenient.  However - we should be able to reconstruct this
-                # manually.
-                last_hex = next((l for l in target_files[file]["lines"][::-1] if self.is_hex(l)),None)
-                if last_hex:
-                    # Get the address left of the colon
-                    addr = int(last_hex.split(":")[0].strip(),16)
-                    # Get the hex bytes right of the colon
-                    hexs = last_hex.split(":")[1].split("//")[0].strip()
-                    # Increment the address by the number of hex bytes
-                    next_addr = addr+len(hexs.split())
-                    # Now we need to get the bytes at the end
-                    hexb = self.get_hex_bytes(hexs.replace(" ",""))
-                    # Get the last occurrence after the split
-                    remaining = target_files[file]["raw"].split(hexb)[-1]
-                    # Iterate in chunks of 16
-                    for chunk in [remaining[i:i+16] for i in range(0,len(remaining),16)]:
-                        # Build a new byte string
-                        hex_string = binascii.hexlify(chunk)
-                        # Decode the bytes if we're on python 3
-                        if 2/3!=0: hex_string = hex_string.decode()
-                        # Ensure the bytes are all upper case
-                        hex_string = hex_string.upper()
-                        l = "   {}: {}".format(
-                            hex(next_addr)[2:].upper().rjust(4,"0"),
-                            " ".join([hex_string[i:i+2] for i in range(0,len(hex_string),2)])
-                        )
-                        # Increment our address
-                        next_addr += len(chunk)
-                        # Append our line
-                        target_files[file]["lines"].append(l)
-                        target_files[file]["table"] += "\n"+l
+                    target_files[file]["raw"] = f.read()
+                self._read_table_header(target_files[file])
+                if not file in cached:
+                    self._append_missing_hex(target_files[file])
+                    if cache_keys.get(file):
+                        self.cache.put(cache_keys[file],target_files[file])
+                target_files[file]["namespace"] = self.build_namespace_index(table=target_files[file])
+                target_files[file]["hex_map"] = self.build_hex_map(table=target_files[file])
             # Remove any that didn't disassemble
             for file in to_remove:
                 target_files.pop(file,None)
@@ -276,6 +255,152 @@ class DSDT:
         # Only return the newly loaded results
         return (target_files, failed,)
 
+    def _read_table_header(self, table):
+        table_bytes = table["raw"]
+        # Let's read the table header and get the info we need
+        #
+        # [0:4]   = Table Signature
+        # [4:8]   = Length (little endian)
+        # [8]     = Compliance Revision
+        # [9]     = Checksum
+        # [10:16] = OEM ID (6 chars, padded to the right with \x00)
+        # [16:24] = Table ID (8 chars, padded to the right with \x00)
+        # [24:28] = OEM Revision (little endian)
+        # 
+        table["signature"] = table_bytes[0:4]
+        table["revision"]  = table_bytes[8]
+        table["oem"]       = table_bytes[10:16]
+        table["id"]        = table_bytes[16:24]
+        table["oem_revision"] = int(binascii.hexlify(table_bytes[24:28][::-1]),16)
+        table["length"]    = len(table_bytes)
+        # Get the printable versions of the sig, oem, and id as needed
+        for key in ("signature","oem","id"):
+            unprintable,ascii_string = self.get_ascii_print(table[key])
+            if unprintable:
+                table[key+"_ascii"] = ascii_string
+        # Cast as int on py2, and try to decode bytes to strings on py3
+        if 2/3==0:
+            table["revision"] = int(binascii.hexlify(table["revision"]),16)
+
+    def _read_disassembled(self, dsl_path):
+        with open(dsl_path,"r") as f:
+            table = f.read()
+        # Remove the compiler info at the start
+        if table.startswith("/*"):
+            table = "*/".join(table.split("*/")[1:]).strip()
+        # Check for "Table Header:" or "Raw Table Data: Length" and strip everything
+        # after the last occurrence
+        for h in ("\nTable Header:","\nRaw Table Data: Length"):
+            if h in table:
+                table = h.join(table.split(h)[:-1]).rstrip()
+                break # Bail on the first match
+        return table
+
+    def _append_missing_hex(self, table):
+        # The disassembler omits the last line of hex data in a mixed listing
+        # file... convenient.  However - we should be able to reconstruct this
+        # manually.
+        last_hex = next((l for l in table["lines"][::-1] if self.is_hex(l)),None)
+        if last_hex:
+            # Get the address left of the colon
+            addr = int(last_hex.split(":")[0].strip(),16)
+            # Get the hex bytes right of the colon
+            hexs = last_hex.split(":")[1].split("//")[0].strip()
+            # Increment the address by the number of hex bytes
+            next_addr = addr+len(hexs.split())
+            # Now we need to get the bytes at the end
+            hexb = self.get_hex_bytes(hexs.replace(" ",""))
+            # Get the last occurrence after the split
+            remaining = table["raw"].split(hexb)[-1]
+            # Iterate in chunks of 16
+            for chunk in [remaining[i:i+16] for i in range(0,len(remaining),16)]:
+                # Build a new byte string
+                hex_string = binascii.hexlify(chunk)
+                # Decode the bytes if we're on python 3
+                if 2/3!=0: hex_string = hex_string.decode()
+                # Ensure the bytes are all upper case
+                hex_string = hex_string.upper()
+                l = "   {}: {}".format(
+                    hex(next_addr)[2:].upper().rjust(4,"0"),
+                    " ".join([hex_string[i:i+2] for i in range(0,len(hex_string),2)])
+                )
+                # Increment our address
+                next_addr += len(chunk)
+                # Append our line
+                table["lines"].append(l)
+                table["table"] += "\n"+l
+
+    def get_iasl_version(self):
+        if self.iasl_version is None:
+            out = self.r.run({"args":[self.iasl,"-v"]})
+            version = re.search(r"version\s+(\d+)",out[0]+out[1],re.IGNORECASE)
+            if version:
+                self.iasl_version = version.group(1)
+            else:
+                # Fall back on the binary itself if iasl doesn't report a version
+                try:
+                    with open(self.iasl,"rb") as f:
+                        self.iasl_version = hashlib.sha256(f.read()).hexdigest()
+                except Exception:
+                    self.iasl_version = ""
+        return self.iasl_version
+
+    def _get_cache_keys(self, folder_path, dsdt_or_ssdt, other_tables):
+        # Returns a dict of table name -> cache key
+        cache_keys = {}
+        try:
+            iasl_version = self.get_iasl_version()
+            table_hashes = {}
+            for x in list(dsdt_or_ssdt)+list(other_tables):
+                with open(os.path.join(folder_path,x),"rb") as f:
+                    table_hashes[x] = self.cache.hash_table(f.read())
+            # DSDT/SSDTs are disassembled together, so they share a context
+            mixed_context = ",".join(sorted(table_hashes[x] for x in dsdt_or_ssdt))
+            for x in dsdt_or_ssdt:
+                cache_keys[x] = self.cache.get_key(table_hashes[x],iasl_version,context=mixed_context)
+            for x in other_tables:
+                cache_keys[x] = self.cache.get_key(table_hashes[x],iasl_version)
+        except Exception as e:
+            self.u.log_message("[DSDT] Unable to compute disassembly cache keys: {}".format(e), level="WARNING")
+            return {}
+        return cache_keys
+
+    def _disassembled_exists(self, folder_path, file_name):
+        # Helper to make sure the file exists and has a non-Zero size
+        check_path = os.path.join(folder_path,file_name)
+        return os.path.isfile(check_path) and os.stat(check_path).st_size > 0
+
+    def _disassemble_table(self, folder_path, table_name, disassembled_name, externals=()):
+        # Disassembles a single DSDT/SSDT in folder_path.  The remaining tables
+        # are passed with -e so external references resolve against the same
+        # namespace -da would have built - if that fails, fall back to the
+        # plain per-table disassembly the serial path retries with.
+        if externals:
+            args = [self.iasl,"-dl","-l","-e"]+list(externals)+["-d",table_name]
+            out = self.r.run({"args":args,"callback":self._log_iasl_output})
+            if out[2] == 0 and self._disassembled_exists(folder_path,disassembled_name):
+                return True
+        self.r.run({"args":[self.iasl,"-dl","-l",table_name],"callback":self._log_iasl_output})
+        return self._disassembled_exists(folder_path,disassembled_name)
+
+    def _disassemble_concurrently(self, folder_path, table_names, target_files, externals=None):
+        # Disassembles each table in its own iasl process, with at most
+        # self.disassembly_workers running at once.  Returns the list of
+        # tables that failed to disassemble, in the order they were passed.
+        if externals is None:
+            externals = table_names
+        def worker(table_name):
+            table_externals = [x for x in externals if x != table_name]
+            return self._disassemble_table(
+                folder_path,
+                table_name,
+                target_files[table_name]["disassembled_name"],
+                externals=table_externals
+            )
+        with ThreadPoolExecutor(max_workers=min(self.disassembly_workers,len(table_names))) as executor:
+            results = list(executor.map(worker,table_names))
+        return [x for x,ok in zip(table_names,results) if not ok]
+
     def get_latest_iasl(self):
         latest_release = self.github.get_latest_release("acpica", "acpica") or {}
 
@@ -443,73 +568,127 @@ class DSDT:
             return None
         return list(self.acpi_tables.values())[0]
 
+    def build_hex_map(self, table=None):
+        if not table: table = self.get_dsdt_or_only()
+        if not table: return {}
+        # Classifies each line once so hex lookups don't need to re-run the
+        # hex regex and re-concatenate hex strings every time.  Per line:
+        #
+        # is_hex      = 1 if the line is a hex line, 0 if source
+        # offset      = AML offset from the hex line's address (-1 for source)
+        # text_pos    = position in hex_text where the line's hex starts (len n+1)
+        # prev_source = last source line at or before the line (-1 if none)
+        # prev_hex    = last hex line at or before the line (-1 if none)
+        # next_source = first source line at or after the line (n if none, len n+1)
+        # next_hex    = first hex line at or after the line (-1 if none, len n+1)
+        lines = table.get("lines",[])
+        n = len(lines)
+        is_hex = bytearray(n)
+        offset = array("i",[-1])*n
+        text_pos = array("i",[0])*(n+1)
+        prev_source = array("i",[-1])*n
+        prev_hex = array("i",[-1])*n
+        next_source = array("i",[n])*(n+1)
+        next_hex = array("i",[-1])*(n+1)
+        hex_parts = []
+        pos = 0
+        last_source = last_hex = -1
+        for i,line in enumerate(lines):
+            text_pos[i] = pos
+            if self.is_hex(line):
+                is_hex[i] = 1
+                offset[i] = int(line.split(":")[0].strip(),16)
+                hex_line = self.get_hex(line)
+                hex_parts.append(hex_line)
+                pos += len(hex_line)
+                last_hex = i
+            else:
+                last_source = i
+            prev_source[i] = last_source
+            prev_hex[i] = last_hex
+        text_pos[n] = pos
+        following_source,following_hex = n,-1
+        for i in range(n-1,-1,-1):
+            if is_hex[i]: following_hex = i
+            else: following_source = i
+            next_source[i] = following_source
+            next_hex[i] = following_hex
+        return {
+            "lines": n,
+            "is_hex": is_hex,
+            "offset": offset,
+            "text_pos": text_pos,
+            "hex_text": "".join(hex_parts),
+            "prev_source": prev_source,
+            "prev_hex": prev_hex,
+            "next_source": next_source,
+            "next_hex": next_hex
+        }
+
+    def get_hex_map(self, table=None):
+        if not table: table = self.get_dsdt_or_only()
+        if not table: return {}
+        # Build (or rebuild) the map if the table's lines changed under us
+        hex_map = table.get("hex_map")
+        if not hex_map or hex_map.get("lines") != len(table.get("lines",[])):
+            hex_map = table["hex_map"] = self.build_hex_map(table=table)
+        return hex_map
+
     def find_previous_hex(self, index=0, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return ("",-1,-1)
         # Returns the index of the previous set of hex digits before the passed index
-        start_index = -1
-        end_index   = -1
-        old_hex = True
-        for i,line in enumerate(table.get("lines","")[index::-1]):
-            if old_hex:
-                if not self.is_hex(line):
-                    # Broke out of the old hex
-                    old_hex = False
-                continue
-            # Not old_hex territory - check if we got new hex
-            if self.is_hex(line): # Checks for a :, but not in comments
-                end_index = index-i
-                hex_text,start_index = self.get_hex_ending_at(end_index,table=table)
-                return (hex_text, start_index, end_index)
-        return ("",start_index,end_index)
+        hex_map = self.get_hex_map(table=table)
+        if not 0 <= index < hex_map["lines"]:
+            return ("",-1,-1)
+        # Walk back out of any hex we're in, then grab the prior hex block
+        source_index = hex_map["prev_source"][index]
+        end_index = hex_map["prev_hex"][source_index-1] if source_index > 0 else -1
+        if end_index == -1:
+            return ("",-1,-1)
+        hex_text,start_index = self.get_hex_ending_at(end_index,table=table)
+        return (hex_text, start_index, end_index)
     
     def find_next_hex(self, index=0, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return ("",-1,-1)
         # Returns the index of the next set of hex digits after the passed index
-        start_index = -1
-        end_index   = -1
-        old_hex = True
-        for i,line in enumerate(table.get("lines","")[index:]):
-            if old_hex:
-                if not self.is_hex(line):
-                    # Broke out of the old hex
-                    old_hex = False
-                continue
-            # Not old_hex territory - check if we got new hex
-            if self.is_hex(line): # Checks for a :, but not in comments
-                start_index = i+index
-                hex_text,end_index = self.get_hex_starting_at(start_index,table=table)
-                return (hex_text, start_index, end_index)
-        return ("",start_index,end_index)
+        hex_map = self.get_hex_map(table=table)
+        if not 0 <= index < hex_map["lines"]:
+            return ("",-1,-1)
+        # Walk out of any hex we're in, then grab the following hex block
+        source_index = hex_map["next_source"][index]
+        start_index = hex_map["next_hex"][source_index+1] if source_index < hex_map["lines"] else -1
+        if start_index == -1:
+            return ("",-1,-1)
+        hex_text,end_index = self.get_hex_starting_at(start_index,table=table)
+        return (hex_text, start_index, end_index)
 
     def is_hex(self, line):
-        return self.hex_match.match(line) is not None
+        # Hex lines always carry an address followed by a colon - skip the
+        # regex for anything that doesn't
+        return ":" in line and self.hex_match.match(line) is not None
 
     def get_hex_starting_at(self, start_index, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return ("",-1)
         # Returns a tuple of the hex, and the ending index
-        hex_text = ""
-        index = -1
-        for i,x in enumerate(table.get("lines","")[start_index:]):
-            if not self.is_hex(x):
-                break
-            hex_text += self.get_hex(x)
-            index = i+start_index
+        hex_map = self.get_hex_map(table=table)
+        if not 0 <= start_index < hex_map["lines"] or not hex_map["is_hex"][start_index]:
+            return ("",-1)
+        index = hex_map["next_source"][start_index]-1
+        hex_text = hex_map["hex_text"][hex_map["text_pos"][start_index]:hex_map["text_pos"][index+1]]
         return (hex_text, index)
 
     def get_hex_ending_at(self, start_index, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return ("",-1)
-        # Returns a tuple of the hex, and the ending index
-        hex_text = ""
-        index = -1
-        for i,x in enumerate(table.get("lines","")[start_index::-1]):
-            if not self.is_hex(x):
-                break
-            hex_text = self.get_hex(x)+hex_text
-            index = start_index-i
+        # Returns a tuple of the hex, and the starting index
+        hex_map = self.get_hex_map(table=table)
+        if not 0 <= start_index < hex_map["lines"] or not hex_map["is_hex"][start_index]:
+            return ("",-1)
+        index = hex_map["prev_source"][start_index]+1
+        hex_text = hex_map["hex_text"][hex_map["text_pos"][index]:hex_map["text_pos"][start_index+1]]
         return (hex_text, index)
 
     def get_shortest_unique_pad(self, current_hex, index, instance=0, table=None):
@@ -559,10 +738,17 @@ class DSDT:
         linel = current_hex.join(parts[0:instance+1])
         liner = current_hex.join(parts[instance+1:])
         last_check = True # Default to forward
+        raw = table["raw"]
+        # Offsets in raw where padl+current_hex+padr occurs (overlaps included) -
+        # narrowed one byte at a time as the pad grows instead of recounting raw
+        positions = None
         while True:
             # Check if our hex string is unique
-            check_bytes = self.get_hex_bytes(padl+current_hex+padr)
-            if table["raw"].count(check_bytes) == 1: # Got it!
+            if positions is None:
+                check_bytes = self.get_hex_bytes(padl+current_hex+padr)
+                positions = self._find_occurrences(raw,check_bytes)
+                check_length = len(check_bytes)
+            if self._count_non_overlapping(positions,check_length) == 1: # Got it!
                 break
             if direction == True or (direction is None and len(padr)<=len(padl)):
                 # Let's check a forward byte
@@ -571,6 +757,12 @@ class DSDT:
                     liner, _index, last_index = self.find_next_hex(last_index, table=table)
                     if last_index == -1: raise Exception("Hit end of file before unique hex was found!")
                 padr  = padr+liner[0:2]
+                if len(liner[0:2]) == 2:
+                    next_byte = self.get_hex_bytes(liner[0:2])
+                    positions = [x for x in positions if raw[x+check_length:x+check_length+1] == next_byte]
+                    check_length += 1
+                else:
+                    positions = None # Odd alignment - recheck from scratch
                 liner = liner[2:]
                 continue
             if direction == False or (direction is None and len(padl)<=len(padr)):
@@ -580,10 +772,46 @@ class DSDT:
                     linel, start_index, _index = self.find_previous_hex(start_index, table=table)
                     if _index == -1: raise Exception("Hit end of file before unique hex was found!")
                 padl  = linel[-2:]+padl
+                if len(linel[-2:]) == 2:
+                    prev_byte = self.get_hex_bytes(linel[-2:])
+                    positions = [x-1 for x in positions if x > 0 and raw[x-1:x] == prev_byte]
+                    check_length += 1
+                else:
+                    positions = None # Odd alignment - recheck from scratch
                 linel = linel[:-2]
                 continue
             break
         return (padl,padr)
+
+    def _find_occurrences(self, raw, check_bytes):
+        # Returns every offset (overlapping included) where check_bytes occurs in raw
+        cached_raw,cached_bytes,positions = self._occurrence_cache
+        if cached_raw is raw and cached_bytes == check_bytes:
+            return list(positions)
+        if not check_bytes:
+            positions = list(range(len(raw)+1))
+        else:
+            positions = []
+            pos = raw.find(check_bytes)
+            while pos != -1:
+                positions.append(pos)
+                pos = raw.find(check_bytes,pos+1)
+        self._occurrence_cache = (raw,check_bytes,positions)
+        return list(positions)
+
+    def _count_non_overlapping(self, positions, length, limit=2):
+        # Counts matches the same way bytes.count() does - leftmost first,
+        # skipping any that overlap the last counted one.  Stops at limit as
+        # we only care whether there's exactly one.
+        count = 0
+        next_allowed = None
+        for pos in positions:
+            if next_allowed is None or pos >= next_allowed:
+                count += 1
+                if count >= limit:
+                    break
+                next_allowed = pos+max(length,1)
+        return count
     
     def get_devices(self,search=None,types=("Device (","Scope ("),strip_comments=False,table=None):
         if not table: table = self.get_dsdt_or_only()
@@ -634,25 +862,31 @@ class DSDT:
     def get_scopes(self, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return []
-        scopes = []
-        for index,line in enumerate(table.get("lines","")):
-            if self.is_hex(line): continue
-            if any(x in line for x in ("Processor (","Scope (","Device (","Method (","Name (")):
-                scopes.append((line,index))
-        return scopes
+        return self.parse_namespace(table=table)[0]
 
     def get_paths(self, table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return []
+        return self.parse_namespace(table=table)[1]
+
+    def parse_namespace(self, table=None):
+        if not table: table = self.get_dsdt_or_only()
+        if not table: return ([],[])
+        # Single pass over the lines that returns a tuple of the scopes
+        # and the sorted paths
+        scopes = []
         # Set up lists for complete paths, as well
         # as our current path reference
         path_list  = []
         _path      = []
         brackets = 0
+        scope_types = ("Processor (","Scope (","Device (","Method (","Name (")
         for i,line in enumerate(table.get("lines",[])):
             if self.is_hex(line):
                 # Skip hex
                 continue
+            if any(x in line for x in scope_types):
+                scopes.append((line,i))
             line = self.get_line(line)
             brackets += line.count("{")-line.count("}")
             while len(_path):
@@ -662,7 +896,7 @@ class DSDT:
                     del _path[-1]
                 else:
                     break
-            type_match = self.type_match.match(line)
+            type_match = self.type_match.match(line) if " (" in line else None
             if type_match:
                 # Add our path entry and save the full path
                 # to the path list as needed
@@ -695,22 +929,75 @@ class DSDT:
                 padded_path = [("\\" if j==0 else"")+x.lstrip("\\").rstrip("_") for j,x in enumerate(path)]
                 path_str = ".".join(padded_path)
                 path_list.append((path_str,i,type_match.group("type")))
-        return sorted(path_list)
+        return (scopes,sorted(path_list))
+
+    def _normalize_path(self, path):
+        # Remove trailing underscores and normalize case for all path elements
+        return ".".join([x.rstrip("_").upper() for x in path.split(".")])
+
+    def build_namespace_index(self, table=None):
+        if not table: table = self.get_dsdt_or_only()
+        if not table: return {}
+        # Builds lookup dicts over the table's paths so path queries
+        # don't need to walk every path each time
+        index = {
+            "path": {}, # path as stored in paths -> [path tuples]
+            "leaf": {}, # normalized last path element -> [path tuples]
+            "type": {}, # lowercase object type -> [path tuples]
+            "hid":  {}, # _HID value -> [_HID path tuples]
+            "leaf_suffix": {} # suffix of a normalized leaf -> [leaves]
+        }
+        lines = table.get("lines",[])
+        for p in table.get("paths",[]):
+            index["path"].setdefault(p[0],[]).append(p)
+            index["leaf"].setdefault(self._normalize_path(p[0]).split(".")[-1],[]).append(p)
+            index["type"].setdefault(p[2].lower(),[]).append(p)
+            if p[0].endswith("._HID"):
+                try: line = self.get_line(lines[p[1]])
+                except: continue
+                index["hid"].setdefault(self._get_hid_value(line),[]).append(p)
+        for leaf in index["leaf"]:
+            for i in range(len(leaf)+1):
+                index["leaf_suffix"].setdefault(leaf[i:],[]).append(leaf)
+        return index
+
+    def _get_hid_value(self, line):
+        # Name (_HID, EisaId ("PNP0C09") /* Embedded Controller Device */)  // _HID: Hardware ID
+        # -> PNP0C09 - the key get_device_paths_with_hid looks up
+        value = line.split("_HID",1)[-1].split("//")[0]
+        value = re.sub(r"/\*.*?\*/","",value)
+        quoted = re.search(r"\"([^\"]*)\"",value)
+        if quoted:
+            return quoted.group(1).upper()
+        return re.sub(r"(EisaId|[\s,\(\)])","",value,flags=re.IGNORECASE).upper()
+
+    def _get_namespace_index(self, table):
+        # Tables loaded by older code paths may not have been indexed yet
+        if not "namespace" in table:
+            table["namespace"] = self.build_namespace_index(table=table)
+        return table["namespace"]
 
     def get_path_of_type(self, obj_type="Device", obj="HPET", table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return []
+        index = self._get_namespace_index(table)
         paths = []
         # Remove trailing underscores and normalize case for all path
         # elements passed
-        obj = ".".join([x.rstrip("_").upper() for x in obj.split(".")])
+        obj = self._normalize_path(obj)
         obj_type = obj_type.lower() if obj_type else obj_type
-        for path in table.get("paths",[]):
-            path_check = ".".join([x.rstrip("_").upper() for x in path[0].split(".")])
-            if (obj_type and obj_type != path[2].lower()) or not path_check.endswith(obj):
-                # Type or object mismatch - skip
-                continue
-            paths.append(path)
+        # Only paths whose last element ends with the last element of obj
+        # can match - pull those from the index
+        leaves = index.get("leaf_suffix",{}).get(obj.split(".")[-1],[])
+        for leaf in leaves:
+            for path in index["leaf"][leaf]:
+                if obj_type and obj_type != path[2].lower():
+                    # Type mismatch - skip
+                    continue
+                if "." in obj and not self._normalize_path(path[0]).endswith(obj):
+                    # Object mismatch - skip
+                    continue
+                paths.append(path)
         return sorted(paths)
 
     def get_device_paths(self, obj="HPET",table=None):
@@ -728,17 +1015,11 @@ class DSDT:
     def get_device_paths_with_hid(self, hid="ACPI000E", table=None):
         if not table: table = self.get_dsdt_or_only()
         if not table: return []
-        devs = []
-        for p in table.get("paths",[]):
-            try:
-                if p[0].endswith("._HID") and hid.upper() in table.get("lines")[p[1]]:
-                    # Save the path, strip the ._HID from the end
-                    devs.append(p[0][:-len("._HID")])
-            except: continue
+        index = self._get_namespace_index(table)
+        # Save the paths, strip the ._HID from the end
+        devs = set(p[0][:-len("._HID")] for p in index["hid"].get(hid.upper(),[]))
         devices = []
-        # Walk the paths again - and save any devices
-        # that match our prior list
-        for p in table.get("paths",[]):
-            if p[0] in devs and p[-1] == "Device":
-                devices.append(p)
-        return devices
\ No newline at end of file
+        # Save any devices that match our prior list
+        for dev in devs:
+            devices.extend(p for p in index["path"].get(dev,[]) if p[-1] == "Device")
+        return sorted(devices)
@@ -0,0 +1,161 @@
+from Scripts import utils
+import os
+import sys
+import errno
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl from linux/fs.h - shares the extents of one file with another (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+class EFIAssembler:
+    """
+    Puts files from OCK_Files into the result folder as cheaply as the file
+    system allows: a reflink, then copy_file_range, then a hardlink and
+    finally a plain copy.
+    """
+    def __init__(self, utils_instance=None):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        # config.plist and the Info.plist of every kext are rewritten in place
+        # during the build, so they must never share storage with OCK_Files
+        self.mutable_extensions = (".plist",)
+        self.stats = {}
+        # (method, source device, destination device) that already failed once
+        self.unsupported = set()
+
+    def _reflink(self, source_path, destination_path):
+        if fcntl is None or not hasattr(fcntl, "ioctl") or not sys.platform.startswith("linux"):
+            raise OSError(errno.EOPNOTSUPP, "FICLONE is not available")
+        with open(source_path, "rb") as source_file, open(destination_path, "wb") as destination_file:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+
+    def _copy_file_range(self, source_path, destination_path):
+        if not hasattr(os, "copy_file_range"):
+            raise OSError(errno.EOPNOTSUPP, "copy_file_range is not available")
+        with open(source_path, "rb") as source_file, open(destination_path, "wb") as destination_file:
+            remaining = os.fstat(source_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining)
+                if not copied:
+                    raise OSError(errno.EOPNOTSUPP, "copy_file_range copied nothing")
+                remaining -= copied
+
+    def _hardlink(self, source_path, destination_path):
+        os.link(source_path, destination_path)
+
+    def clone_file(self, source_path, destination_path):
+        # Never write through whatever is already there - it may be a hardlink
+        if os.path.lexists(destination_path):
+            os.remove(destination_path)
+
+        methods = [("reflink", self._reflink), ("copy_file_range", self._copy_file_range)]
+        if not destination_path.lower().endswith(self.mutable_extensions):
+            methods.append(("hardlink", self._hardlink))
+
+        devices = (os.stat(source_path).st_dev, os.stat(os.path.dirname(destination_path)).st_dev)
+        for method_name, method in methods:
+            if (method_name,) + devices in self.unsupported:
+                continue
+            try:
+                method(source_path, destination_path)
+            except OSError:
+                self.unsupported.add((method_name,) + devices)
+                if os.path.lexists(destination_path):
+                    os.remove(destination_path)
+                continue
+            if method_name != "hardlink":
+                shutil.copystat(source_path, destination_path)
+            break
+        else:
+            method_name = "copy"
+            shutil.copy2(source_path, destination_path)
+
+        self.stats[method_name] = self.stats.get(method_name, 0) + 1
+        return method_name
+
+    def materialize(self, source_dir, destination_dir, directories, files):
+        """Creates directories and clones files (both relative to source_dir) into destination_dir"""
+        for directory in directories:
+            os.makedirs(os.path.join(destination_dir, directory), exist_ok=True)
+        for relative_path in files:
+            destination_path = os.path.join(destination_dir, relative_path)
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            self.clone_file(os.path.join(source_dir, relative_path), destination_path)
+
+    def plan_tree(self, source_dir, skip_directory=None, skip_file=None):
+        """
+        Returns (directories, files) below source_dir as "/" separated
+        relative paths, leaving out whatever skip_directory/skip_file reject.
+        """
+        directories = []
+        files = []
+        for root, dirs, names in os.walk(source_dir, followlinks=True):
+            relative_root = os.path.relpath(root, source_dir).replace("\\", "/")
+            relative_root = "" if relative_root == "." else relative_root + "/"
+
+            kept_dirs = []
+            for name in sorted(dirs):
+                if skip_directory and skip_directory(relative_root + name, os.path.join(root, name)):
+                    continue
+                kept_dirs.append(name)
+                directories.append(relative_root + name)
+            dirs[:] = kept_dirs
+
+            for name in sorted(names):
+                if skip_file and skip_file(relative_root + name):
+                    continue
+                files.append(relative_root + name)
+        return directories, files
+
+    def copy_tree(self, source_dir, destination_dir):
+        directories, files = self.plan_tree(source_dir)
+        os.makedirs(destination_dir, exist_ok=True)
+        self.materialize(source_dir, destination_dir, directories, files)
+
+    def plan_opencore_files(self, source_dir, config_data):
+        """
+        The part of OCK_Files/OpenCorePkg that ends up in an EFI built with
+        config_data: only the loaded drivers and tools, only the selected
+        picker theme, no audio resources, manifests or config.plist (the
+        build writes its own).
+        """
+        loaded_drivers = [driver.get("Path") for driver in config_data.get("UEFI", {}).get("Drivers", [])]
+        loaded_tools = [tool.get("Path") for tool in config_data.get("Misc", {}).get("Tools", [])]
+        picker_variant = config_data.get("Misc", {}).get("Boot", {}).get("PickerVariant")
+        if picker_variant in (None, "Auto"):
+            picker_variant = "Acidanthera/GoldenGate"
+
+        drivers_prefix = "EFI/OC/Drivers/"
+        tools_prefix = "EFI/OC/Tools/"
+        image_prefix = "EFI/OC/Resources/Image/"
+
+        def skip_directory(relative_path, path):
+            if relative_path == "EFI/OC/Resources/Audio":
+                return True
+            if relative_path.startswith(image_prefix) and not os.path.basename(path).startswith("."):
+                # A folder holding .icns files is a picker theme
+                if ".icns" in ", ".join(os.listdir(path)):
+                    return picker_variant not in relative_path[len(image_prefix):]
+            return False
+
+        def skip_file(relative_path):
+            if relative_path in ("manifest.json", "manifest.stat.json", "EFI/OC/config.plist"):
+                return True
+            if os.path.basename(relative_path).startswith(".") or not relative_path.lower().endswith(".efi"):
+                return False
+            if relative_path.startswith(drivers_prefix):
+                return relative_path[len(drivers_prefix):] not in loaded_drivers
+            if relative_path.startswith(tools_prefix):
+                return relative_path[len(tools_prefix):] not in loaded_tools
+            return False
+
+        return self.plan_tree(source_dir, skip_directory, skip_file)
+
+    def log_stats(self):
+        if self.stats:
+            self.utils.log_message("[EFI ASSEMBLER] Files placed: {}".format(", ".join("{} {}".format(count, method) for method, count in sorted(self.stats.items()))), level="INFO", to_build_log=True)
+        self.stats = {}
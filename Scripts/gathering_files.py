@@ -10,10 +10,14 @@ import subprocess
 import platform
 import sys
 import json
-import time
-import urllib.request
-import ssl
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if sys.version_info >= (3, 0):
+    from urllib.parse import quote, urljoin
+else:
+    from urllib import quote
+    from urlparse import urljoin
 
 os_name = platform.system()
 
@@ -25,13 +29,14 @@ class gatheringFiles:
         self.fetcher = resource_fetcher_instance if resource_fetcher_instance else resource_fetcher.ResourceFetcher()
         self.integrity_checker = integrity_checker_instance if integrity_checker_instance else integrity_checker.IntegrityChecker()
         
-        self.dortania_builds_url = "https://gitapi.simplehac.top/https://raw.githubusercontent.com/dortania/build-repo/builds/latest.json"
-        self.ocbinarydata_url = "https://gitapi.simplehac.top/https://github.com/acidanthera/OcBinaryData/archive/refs/heads/master.zip"
+        # GitHub 地址由 fetcher 的镜像管理器改写为最快的镜像
+        self.dortania_builds_url = "https://raw.githubusercontent.com/dortania/build-repo/builds/latest.json"
+        self.ocbinarydata_url = "https://github.com/acidanthera/OcBinaryData/archive/refs/heads/master.zip"
         self.sksp_manifest_url = "https://next.oclpapi.simplehac.cn/SKSP/manifest.json"
         
-        self.amd_vanilla_patches_url = "https://gitapi.simplehac.top/https://raw.githubusercontent.com/AMD-OSX/AMD_Vanilla/beta/patches.plist"
-        self.aquantia_macos_patches_url = "https://gitapi.simplehac.top/https://raw.githubusercontent.com/CaseySJ/Aquantia-macOS-Patches/refs/heads/main/CaseySJ-Aquantia-Patch-Sets-1-and-2.plist"
-        self.hyper_threading_patches_url = "https://gitapi.simplehac.top/https://github.com/b00t0x/CpuTopologyRebuild/raw/refs/heads/master/patches_ht.plist"
+        self.amd_vanilla_patches_url = "https://raw.githubusercontent.com/AMD-OSX/AMD_Vanilla/beta/patches.plist"
+        self.aquantia_macos_patches_url = "https://raw.githubusercontent.com/CaseySJ/Aquantia-macOS-Patches/refs/heads/main/CaseySJ-Aquantia-Patch-Sets-1-and-2.plist"
+        self.hyper_threading_patches_url = "https://github.com/b00t0x/CpuTopologyRebuild/raw/refs/heads/master/patches_ht.plist"
         
         self.temporary_dir = self.utils.get_temporary_dir()
         
@@ -50,6 +55,9 @@ class gatheringFiles:
             self.app_root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
             self.ock_files_dir = os.path.join(self.app_root, "OCK_Files")
         
+        # 同时进行的下载数量上限
+        self.download_workers = 4
+
         self.download_history_file = os.path.join(self.ock_files_dir, "history.json")
         self.sksp_manifest_file = os.path.join(self.ock_files_dir, "manifest.json")
 
@@ -88,11 +96,7 @@ class gatheringFiles:
         
     def update_download_database(self, kexts, download_history):
         download_database = download_history.copy()
-        dortania_builds_data = json.loads(
-            json.dumps(
-                self.fetcher.fetch_and_parse_content(self.dortania_builds_url, "json")
-            ).replace("https://github.com", "https://gitapi.simplehac.top/https://github.com")
-        )
+        dortania_builds_data = self.fetcher.fetch_and_parse_content(self.dortania_builds_url, "json")
         seen_repos = set()
 
         def add_product_to_download_database(products):
@@ -232,6 +236,7 @@ class gatheringFiles:
         
         self.utils.create_folder(self.temporary_dir)
         seen_download_urls = set()
+        download_jobs = []
 
         for product in kexts + [{"Name": "OpenCorePkg"}]:
             if not isinstance(product, dict) and not product.checked:
@@ -301,12 +306,15 @@ class gatheringFiles:
             if product_history_index is not None:
                 history_item = download_history[product_history_index]
                 is_latest_id = (product_id == history_item.get("id"))
-                folder_is_valid, _ = self.integrity_checker.verify_folder_integrity(asset_dir, manifest_path)
+                folder_is_valid, issues = self.integrity_checker.verify_folder_integrity(asset_dir, manifest_path)
                 
                 if is_latest_id and folder_is_valid:
                     self.utils.log_message("[收集文件] {} 的最新版本已下载。".format(product_name), level="INFO", to_build_log=True)
                     continue
 
+                if folder_is_valid is False:
+                    self.utils.log_message("[收集文件] {} 校验失败: {}".format(product_name, ", ".join(issues["changed_subtrees"])), level="WARNING", to_build_log=True)
+
             self.utils.log_message("[收集文件] 正在更新 {}...".format(product_name), level="INFO", to_build_log=True)
             if product_download_url:
                 self.utils.log_message("[收集文件] 正在从 {} 下载".format(product_download_url), level="INFO", to_build_log=True)
@@ -315,47 +323,124 @@ class gatheringFiles:
                 self._safe_rmtree(self.temporary_dir)
                 return False
 
-            zip_path = os.path.join(self.temporary_dir, product_name) + ".zip"
-            if not self.fetcher.download_and_save_file(product_download_url, zip_path, sha256_hash):
-                folder_is_valid, _ = self.integrity_checker.verify_folder_integrity(asset_dir, manifest_path)
-                if product_history_index is not None and folder_is_valid:
-                    self.utils.log_message("[收集文件] 使用之前下载的 {} 版本。".format(product_name), level="INFO", to_build_log=True)
-                    continue
-                else:
-                    self.utils.log_message("[收集文件] 暂时无法下载 {}。请稍后再试。".format(product_name), level="ERROR", to_build_log=True)
-                    raise Exception("暂时无法下载 {}。请稍后再试。".format(product_name))
-            
-            self.utils.extract_zip_file(zip_path)
-            self.utils.create_folder(asset_dir, remove_content=True)
-            
-            while True:
-                nested_zip_files = self.utils.find_matching_paths(os.path.join(self.temporary_dir, product_name), extension_filter=".zip")
-                if not nested_zip_files:
-                    break
-                for zip_file, _ in nested_zip_files:
-                    full_zip_path = os.path.join(self.temporary_dir, product_name, zip_file)
-                    self.utils.extract_zip_file(full_zip_path)
-                    os.remove(full_zip_path)
-
-            if "OpenCore" in product_name:
-                oc_binary_data_zip_path = os.path.join(self.temporary_dir, "OcBinaryData.zip")
-                self.utils.log_message("[收集文件] 请稍候，正在下载 OcBinaryData...", level="INFO", to_build_log=True)
-                self.utils.log_message("[收集文件] 正在从 {} 下载".format(self.ocbinarydata_url), level="INFO", to_build_log=True)
-                self.fetcher.download_and_save_file(self.ocbinarydata_url, oc_binary_data_zip_path)
-
-                if not os.path.exists(oc_binary_data_zip_path):
-                    self.utils.log_message("[收集文件] 暂时无法下载 OcBinaryData。请稍后再试。", level="ERROR", to_build_log=True)
-                    self._safe_rmtree(self.temporary_dir)
-                    return False
-                
-                self.utils.extract_zip_file(oc_binary_data_zip_path)
-
-            if self.move_bootloader_kexts_to_product_directory(product_name):
-                self.integrity_checker.generate_folder_manifest(asset_dir, manifest_path)
-                self._update_download_history(download_history, product_name, product_id, product_download_url, sha256_hash)
+            download_jobs.append({
+                "product_name": product_name,
+                "product_id": product_id,
+                "url": product_download_url,
+                "sha256": sha256_hash,
+                "history_index": product_history_index,
+                "asset_dir": asset_dir,
+                "manifest_path": manifest_path
+            })
+
+        if download_jobs:
+            # 并行下载开始前先测一次各镜像的速度，避免每个下载都去竞速
+            self.fetcher.probe_mirrors(download_jobs[0]["url"])
+            progress = resource_fetcher.DownloadProgressTracker(self.fetcher.progress_channel, self.utils)
+            executor = ThreadPoolExecutor(max_workers=max(1, min(self.download_workers, len(download_jobs) + 1)))
+            futures = []
+            ocbinarydata_future = None
+            try:
+                futures = [executor.submit(self._fetch_product, job, progress) for job in download_jobs]
+                # OcBinaryData 只在 OpenCorePkg 需要更新时下载，与其他下载并行进行
+                if any("OpenCore" in job["product_name"] for job in download_jobs):
+                    ocbinarydata_future = executor.submit(self._fetch_ocbinarydata, progress)
+
+                # 下载并行进行，移动文件和更新下载历史按原顺序在当前线程完成
+                for job, future in zip(download_jobs, futures):
+                    product_name = job["product_name"]
+                    asset_dir = job["asset_dir"]
+                    manifest_path = job["manifest_path"]
+
+                    if not future.result():
+                        folder_is_valid, _ = self.integrity_checker.verify_folder_integrity(asset_dir, manifest_path)
+                        if job["history_index"] is not None and folder_is_valid:
+                            self.utils.log_message("[收集文件] 使用之前下载的 {} 版本。".format(product_name), level="INFO", to_build_log=True)
+                            continue
+                        else:
+                            self.utils.log_message("[收集文件] 暂时无法下载 {}。请稍后再试。".format(product_name), level="ERROR", to_build_log=True)
+                            raise Exception("暂时无法下载 {}。请稍后再试。".format(product_name))
+
+                    self.utils.create_folder(asset_dir, remove_content=True)
+
+                    if "OpenCore" in product_name and not ocbinarydata_future.result():
+                        self.utils.log_message("[收集文件] 暂时无法下载 OcBinaryData。请稍后再试。", level="ERROR", to_build_log=True)
+                        self._safe_rmtree(self.temporary_dir)
+                        return False
+
+                    # 产品目录内容已变化，kext 索引需重新扫描该产品
+                    self.kext.kext_index.invalidate(product_name)
+                    if self.move_bootloader_kexts_to_product_directory(product_name):
+                        self.integrity_checker.generate_folder_manifest(asset_dir, manifest_path, tree=True)
+                        self._update_download_history(download_history, product_name, job["product_id"], job["url"], job["sha256"])
+            finally:
+                # 出错时取消尚未开始的下载（shutdown 的 cancel_futures 需要 Python 3.9+）
+                for future in futures + [ocbinarydata_future]:
+                    if future:
+                        future.cancel()
+                executor.shutdown(wait=True)
+                progress.finish()
 
         self._safe_rmtree(self.temporary_dir)
         return True
+
+    def _fetch_product(self, job, progress=None):
+        """
+        在工作线程中下载并解压单个产品，只写入 temporary_dir 下该产品自己的目录
+        """
+        product_name = job["product_name"]
+        zip_path = os.path.join(self.temporary_dir, product_name) + ".zip"
+        progress_callback = progress.get_callback(product_name) if progress else None
+        if not self.fetcher.download_and_save_file(job["url"], zip_path, job["sha256"], progress_callback=progress_callback):
+            return False
+
+        # 只解压最终会放入 OCK_Files 的文件，嵌套的压缩包直接在内存中展开
+        self.utils.extract_zip_file(zip_path, member_filter=self._get_extraction_filter(product_name))
+
+        return True
+
+    def _get_extraction_filter(self, product_name):
+        """
+        返回解压过滤函数，与 move_bootloader_kexts_to_product_directory 实际移动的文件保持一致：
+        - 驱动：.kext 包内的文件（跳过 Debug 版本）以及可能包含它们的嵌套压缩包
+        - OpenCorePkg：X64/EFI、Docs/Sample.plist 和 macserial
+        """
+        def is_hidden(parts):
+            return any(part.startswith(".") or part == "__MACOSX" for part in parts)
+
+        if "OpenCore" in product_name:
+            def member_filter(path):
+                parts = path.split("/")
+                if is_hidden(parts):
+                    return False
+                return path.startswith("X64/EFI/") or path == "Docs/Sample.plist" or "macserial" in parts[-1]
+        else:
+            def member_filter(path):
+                parts = path.split("/")
+                if is_hidden(parts) or "debug" in path.lower():
+                    return False
+                if path.lower().endswith(".zip"):
+                    return True
+                return any(part.lower().endswith(".kext") for part in parts[:-1])
+
+        return member_filter
+
+    def _fetch_ocbinarydata(self, progress=None):
+        oc_binary_data_zip_path = os.path.join(self.temporary_dir, "OcBinaryData.zip")
+        self.utils.log_message("[收集文件] 请稍候，正在下载 OcBinaryData...", level="INFO", to_build_log=True)
+        self.utils.log_message("[收集文件] 正在从 {} 下载".format(self.ocbinarydata_url), level="INFO", to_build_log=True)
+        progress_callback = progress.get_callback("OcBinaryData") if progress else None
+        self.fetcher.download_and_save_file(self.ocbinarydata_url, oc_binary_data_zip_path, progress_callback=progress_callback)
+
+        if not os.path.exists(oc_binary_data_zip_path):
+            return False
+
+        # 只需要 OcBinaryData-master 下的各个资源目录
+        self.utils.extract_zip_file(
+            oc_binary_data_zip_path,
+            member_filter=lambda path: len(path.split("/")) > 2 and not any(part.startswith(".") for part in path.split("/"))
+        )
+        return True
     
     def get_kernel_patches(self, patches_name, patches_url):
         try:
@@ -448,18 +533,15 @@ class gatheringFiles:
     def fetch_remote_sksp_info(self):
         """获取远程 SKSP manifest 信息"""
         try:
-            return self.fetcher.fetch_and_parse_content(self.sksp_manifest_url, "json")
+            # 始终向服务器确认 manifest 是否有更新（未修改时服务器返回 304）
+            return self.fetcher.fetch_and_parse_content(self.sksp_manifest_url, "json", max_age=0)
         except:
             try:
-                req = urllib.request.Request(
+                with self.fetcher.open_url(
                     self.sksp_manifest_url, 
-                    headers={'User-Agent': 'Mozilla/5.0 SimpleKaruzi/1.0'}
-                )
-                ctx = ssl.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl.CERT_NONE
-                
-                with urllib.request.urlopen(req, context=ctx) as response:
+                    headers={'User-Agent': 'Mozilla/5.0 SimpleKaruzi/1.0'},
+                    verify=False
+                ) as response:
                     return json.loads(response.read().decode())
             except Exception as e:
                 return None
@@ -477,6 +559,13 @@ class gatheringFiles:
         if not remote_info:
             return False, "无法获取远程 SKSP 信息 (请检查网络)"
 
+        # 服务器提供逐文件清单时只下载有变化的文件
+        if remote_info.get("delta") and self.check_sksp_status()[0]:
+            success, msg = self.apply_sksp_delta(remote_info, dialog)
+            if success is not None:
+                return success, msg
+            self.utils.log_message("[SKSP] 无法增量更新 ({})，改为下载完整资源包。".format(msg), level="WARNING")
+
         download_url = remote_info.get("download_url")
         sha256 = remote_info.get("sha256")
         
@@ -489,32 +578,41 @@ class gatheringFiles:
             self._safe_rmtree(safe_temp_root)
         os.makedirs(safe_temp_root, exist_ok=True)
         
-        temp_zip = os.path.join(safe_temp_root, "SKSP.zip")
+        # 下载文件放在安装目录之外，中断或取消后下次可以断点续传
+        download_dir = os.path.join(tempfile.gettempdir(), "SKSP_Download")
+        os.makedirs(download_dir, exist_ok=True)
+        temp_zip = os.path.join(download_dir, "SKSP.zip")
+
+        # 进度通过 progress_channel 合并后再刷新对话框，而不是每个数据块都刷新一次
+        def on_progress(event):
+            if event.source == "SKSP" and dialog:
+                dialog.update_progress(event.percent, "正在下载... {:.2f} MB/s".format(event.speed / 1024 / 1024))
         
         try:
             if dialog:
                 dialog.update_progress(0, "正在连接...")
             
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            req = urllib.request.Request(
+            response, out_file, downloaded_size, total_size = self.fetcher.open_resumable_download(
                 download_url, 
-                headers={'User-Agent': 'Mozilla/5.0 SimpleKaruzi/1.0'}
+                temp_zip,
+                headers={'User-Agent': 'Mozilla/5.0 SimpleKaruzi/1.0'},
+                timeout=30,
+                verify=False
             )
-            
-            response = urllib.request.urlopen(req, context=ctx)
-            total_size = int(response.info().get('Content-Length', 0))
+            total_size = total_size or 0
             
             if total_size > 0 and total_size < 1024 * 10: 
+                response.close()
+                out_file.close()
+                self.fetcher.discard_resumable_download(temp_zip)
                 return False, "下载链接返回的文件无效 (过小)。"
             
-            downloaded_size = 0
             chunk_size = 8192 * 4
-            start_time = time.time()
+            # 边下载边计算 SHA256，校验时无需再次读取整个文件
+            local_sha = self.integrity_checker.get_sha256_hasher(out_file.name if downloaded_size else None)
+            self.fetcher.progress_channel.subscribe(on_progress)
             
-            with open(temp_zip, 'wb') as out_file:
+            with out_file:
                 while True:
                     if dialog and dialog.is_canceled():
                         response.close()
@@ -525,19 +623,23 @@ class gatheringFiles:
                         break
                     
                     out_file.write(chunk)
+                    local_sha.update(chunk)
                     downloaded_size += len(chunk)
                     
-                    if dialog:
-                        progress = int(downloaded_size * 100 / total_size) if total_size > 0 else 0
-                        elapsed = time.time() - start_time
-                        speed = downloaded_size / (elapsed if elapsed > 0 else 1) / 1024 / 1024 # MB/s
-                        dialog.update_progress(progress, "正在下载... {:.2f} MB/s".format(speed))
+                    self.fetcher.progress_channel.publish("SKSP", downloaded_size, total_size)
+            response.close()
+            self.fetcher.progress_channel.publish("SKSP", downloaded_size, total_size, done=True)
+
+            # 服务器未返回文件大小时，由 finish_resumable_download 校验 SHA256
+            local_sha = local_sha.hexdigest()
+            if not self.fetcher.finish_resumable_download(temp_zip, total_size, sha256, local_sha):
+                return False, "下载未完成，请重试以继续下载。"
             
             # 校验
             if dialog: dialog.update_progress(95, "正在校验...")
             if sha256:
-                local_sha = self.integrity_checker.get_sha256(temp_zip)
-                if local_sha and local_sha.lower() != sha256.lower():
+                if local_sha.lower() != sha256.lower():
+                    os.remove(temp_zip)
                     return False, "文件校验失败\n期望: {}...\n实际: {}...".format(sha256[:10], local_sha[:10])
             
             # 解压
@@ -555,13 +657,14 @@ class gatheringFiles:
                 if self.ock_files_dir == self.app_root or self.ock_files_dir == os.path.expanduser("~"):
                     return False, "目标安装路径不安全，已终止。"
 
-                if os.path.exists(self.ock_files_dir):
-                    self._safe_rmtree(self.ock_files_dir)
-                
-                shutil.move(extracted_ock, self.ock_files_dir)
-                
-                if not os.path.exists(self.sksp_manifest_file):
-                    self.utils.write_file(self.sksp_manifest_file, remote_info)
+                # 先移动到 OCK_Files 旁边（同一分区），再整体替换
+                staging_dir = self.ock_files_dir + ".staging"
+                self._safe_rmtree(staging_dir)
+                shutil.move(extracted_ock, staging_dir)
+                if not os.path.exists(os.path.join(staging_dir, "manifest.json")):
+                    self.utils.write_file(os.path.join(staging_dir, "manifest.json"), self._strip_sksp_delta(remote_info))
+                self._swap_ock_files(staging_dir)
+                os.remove(temp_zip)
             else:
                 return False, "压缩包结构不正确（未找到 OCK_Files 目录）"
                 
@@ -570,9 +673,200 @@ class gatheringFiles:
         except Exception as e:
             return False, f"发生错误: {str(e)}"
         finally:
+            self.fetcher.progress_channel.unsubscribe(on_progress)
             if os.path.exists(safe_temp_root):
                 self._safe_rmtree(safe_temp_root)
 
+    def _strip_sksp_delta(self, remote_info):
+        """本地只保存版本信息，逐文件清单不写入 manifest.json"""
+        return {key: value for key, value in remote_info.items() if key != "delta"}
+
+    def _swap_ock_files(self, new_ock_dir):
+        """
+        用 new_ock_dir 替换 OCK_Files。两次重命名完成切换，
+        旧目录在新目录就位后才删除，失败时还原。
+        """
+        if self.ock_files_dir == self.app_root or self.ock_files_dir == os.path.expanduser("~"):
+            raise Exception("目标安装路径不安全，已终止。")
+
+        old_dir = self.ock_files_dir + ".old"
+        self._safe_rmtree(old_dir)
+        has_old = os.path.exists(self.ock_files_dir)
+        if has_old:
+            os.rename(self.ock_files_dir, old_dir)
+        try:
+            os.rename(new_ock_dir, self.ock_files_dir)
+        except Exception:
+            if has_old:
+                os.rename(old_dir, self.ock_files_dir)
+            raise
+        self._safe_rmtree(old_dir)
+
+    def _get_local_sksp_files(self, scopes):
+        """
+        返回 OCK_Files 中 scopes（顶层目录或文件）下每个文件的 SHA256。
+        产品目录的 manifest 校验通过时直接使用其中的哈希，否则重新计算。
+        """
+        local_files = {}
+        for scope in scopes:
+            scope_path = os.path.join(self.ock_files_dir, scope)
+            if os.path.isfile(scope_path):
+                local_files[scope] = self.integrity_checker.get_sha256(scope_path)
+                continue
+            if not os.path.isdir(scope_path):
+                continue
+
+            manifest_path = os.path.join(scope_path, "manifest.json")
+            folder_is_valid = os.path.exists(manifest_path) and self.integrity_checker.verify_folder_integrity(scope_path, manifest_path)[0]
+            if folder_is_valid:
+                scope_files, _ = self.integrity_checker.load_manifest(manifest_path)
+            else:
+                scope_files = self.integrity_checker.generate_folder_manifest(scope_path, manifest_path, save_manifest=False) or {}
+
+            for relative_path, file_hash in scope_files.items():
+                local_files[scope + "/" + relative_path] = file_hash
+        return local_files
+
+    def _check_live_sksp_scopes(self, scopes):
+        """增量更新失败后确认正在使用的 OCK_Files 未被改动"""
+        for scope in sorted(scopes):
+            scope_path = os.path.join(self.ock_files_dir, scope)
+            manifest_path = os.path.join(scope_path, "manifest.json")
+            if os.path.isdir(scope_path) and os.path.exists(manifest_path):
+                is_valid, issues = self.integrity_checker.verify_folder_integrity(scope_path, manifest_path)
+                if is_valid is False:
+                    self.utils.log_message("[SKSP] 增量更新失败后 {} 校验未通过: {}".format(scope, ", ".join(issues.get("changed_subtrees", []))), level="ERROR")
+
+    def apply_sksp_delta(self, remote_info, dialog=None):
+        """
+        按远程逐文件清单增量更新 OCK_Files：只下载新增或有变化的文件，
+        在暂存目录中组装新的 OCK_Files（未变化的文件使用硬链接），最后整体替换。
+
+        remote_info["delta"] 格式：
+            {"base_url": 文件下载地址前缀, "files": {相对 OCK_Files 的路径: sha256}}
+        或用 "files_url" 指向单独的清单。
+
+        返回 (True/False, 信息)；返回 (None, 原因) 表示应改为完整下载。
+        """
+        delta = remote_info.get("delta") or {}
+        base_url = delta.get("base_url")
+        remote_files = delta.get("files")
+        if remote_files is None and delta.get("files_url"):
+            remote_files = self.fetcher.fetch_and_parse_content(urljoin(self.sksp_manifest_url, delta["files_url"]), "json", max_age=0)
+        if not base_url or not isinstance(remote_files, dict) or not remote_files:
+            return None, "清单中缺少逐文件信息"
+        base_url = urljoin(self.sksp_manifest_url, base_url)
+
+        remote_files = {
+            relative_path.replace("\\", "/").strip("/"): file_hash
+            for relative_path, file_hash in remote_files.items()
+            if not relative_path.endswith(".stat.json")
+        }
+        if any(".." in relative_path.split("/") for relative_path in remote_files):
+            return None, "清单中包含无效路径"
+
+        # 远程清单覆盖的顶层目录中，多余的本地文件会被删除；其余本地内容保持不变
+        scopes = set(relative_path.split("/")[0] for relative_path in remote_files)
+        local_files = self._get_local_sksp_files(scopes)
+        for relative_path in remote_files:
+            # 不在产品 manifest 中的文件（如 .md）单独计算
+            file_path = os.path.join(self.ock_files_dir, relative_path)
+            if relative_path not in local_files and os.path.isfile(file_path):
+                local_files[relative_path] = self.integrity_checker.get_sha256(file_path)
+        changed_files = sorted(
+            relative_path for relative_path, file_hash in remote_files.items()
+            if (local_files.get(relative_path) or "").lower() != (file_hash or "").lower()
+        )
+        removed_files = set(local_files) - set(remote_files)
+        self.utils.log_message("[SKSP] 增量更新: {} 个文件需要下载，{} 个文件将被删除".format(len(changed_files), len(removed_files)), level="INFO")
+
+        if not changed_files and not removed_files:
+            self.utils.write_file(self.sksp_manifest_file, self._strip_sksp_delta(remote_info))
+            return True, "资源包已是最新"
+
+        staging_dir = self.ock_files_dir + ".staging"
+        self._safe_rmtree(staging_dir)
+
+        def on_progress(event):
+            if event.source == "SKSP" and dialog:
+                dialog.update_progress(event.percent, "正在增量更新... {:.2f} MB/s".format(event.speed / 1024 / 1024))
+
+        progress = None
+        executor = None
+        futures = {}
+        try:
+            if dialog:
+                dialog.update_progress(0, "正在准备增量更新...")
+
+            # 暂存目录：未变化的文件硬链接（不支持时复制）过去。
+            # manifest 等 .json 元数据之后会在暂存目录中重写，必须复制，
+            # 否则写入会通过硬链接改动正在使用的 OCK_Files
+            skipped_files = set(changed_files) | removed_files
+            for root, _, files in os.walk(self.ock_files_dir):
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    relative_path = os.path.relpath(file_path, self.ock_files_dir).replace("\\", "/")
+                    if relative_path in skipped_files:
+                        continue
+                    staged_path = os.path.join(staging_dir, relative_path)
+                    os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+                    if name.endswith(".json"):
+                        shutil.copy2(file_path, staged_path)
+                        continue
+                    try:
+                        os.link(file_path, staged_path)
+                    except OSError:
+                        shutil.copy2(file_path, staged_path)
+
+            if changed_files:
+                self.fetcher.progress_channel.subscribe(on_progress)
+                progress = resource_fetcher.DownloadProgressTracker(self.fetcher.progress_channel, self.utils, source="SKSP")
+
+                executor = ThreadPoolExecutor(max_workers=self.download_workers)
+                for relative_path in changed_files:
+                    staged_path = os.path.join(staging_dir, relative_path)
+                    os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+                    future = executor.submit(
+                        self.fetcher.download_and_save_file,
+                        base_url + quote(relative_path),
+                        staged_path,
+                        remote_files[relative_path],
+                        progress_callback=progress.get_callback(relative_path),
+                        headers={'User-Agent': 'Mozilla/5.0 SimpleKaruzi/1.0'},
+                        verify=False
+                    )
+                    futures[future] = relative_path
+                for future in as_completed(futures):
+                    if dialog and dialog.is_canceled():
+                        return False, "用户取消"
+                    if not future.result():
+                        return False, "下载 {} 失败".format(futures[future])
+
+            # 有变化的产品目录重新生成 manifest
+            changed_scopes = set(relative_path.split("/")[0] for relative_path in set(changed_files) | removed_files)
+            for scope in changed_scopes:
+                scope_path = os.path.join(staging_dir, scope)
+                if os.path.isdir(scope_path) and os.path.exists(os.path.join(self.ock_files_dir, scope, "manifest.json")):
+                    self.integrity_checker.generate_folder_manifest(scope_path, tree=True)
+
+            self.utils.write_file(os.path.join(staging_dir, "manifest.json"), self._strip_sksp_delta(remote_info), atomic=True)
+            self._swap_ock_files(staging_dir)
+            return True, "增量更新成功（{} 个文件）".format(len(changed_files))
+
+        except Exception as e:
+            self._check_live_sksp_scopes(scopes)
+            return False, f"发生错误: {str(e)}"
+        finally:
+            if executor:
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+            if progress:
+                progress.finish()
+            self.fetcher.progress_channel.unsubscribe(on_progress)
+            if os.path.exists(staging_dir):
+                self._safe_rmtree(staging_dir)
+
     def check_sksp_on_startup(self):
         """启动时检查逻辑"""
         exists, _ = self.check_sksp_status()
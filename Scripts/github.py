@@ -7,14 +7,16 @@ class Github:
         self.utils = utils_instance if utils_instance else utils.Utils()
         self.fetcher = resource_fetcher_instance if resource_fetcher_instance else resource_fetcher.ResourceFetcher()
 
-    def get_commits(self, owner, repo, branch="main", per_page=1):
+    def get_commits(self, owner, repo, branch="main", per_page=1, max_age=None):
         """
         使用 GitHub API 获取提交信息
         API: GET /repos/{owner}/{repo}/commits
+        max_age: 缓存的有效秒数，默认使用 fetcher 的元数据缓存 TTL；
+                 过期后通过 ETag 条件请求重新验证，304 不计入 API 速率限制
         """
         url = "https://api.github.com/repos/{}/{}/commits?sha={}&per_page={}".format(owner, repo, branch, per_page)
         
-        response = self.fetcher.fetch_and_parse_content(url)
+        response = self.fetcher.fetch_and_parse_content(url, max_age=max_age)
 
         if not response:
             raise ValueError("无法从 GitHub 获取提交信息。")
@@ -47,14 +49,15 @@ class Github:
 
         raise ValueError("在分支 {} 上找不到仓库 {} 的提交信息。".format(branch, repo))
 
-    def get_latest_release(self, owner, repo):
+    def get_latest_release(self, owner, repo, max_age=None):
         """
         使用 GitHub API 获取最新发布信息
         API: GET /repos/{owner}/{repo}/releases/latest
+        max_age: 同 get_commits
         """
         url = "https://api.github.com/repos/{}/{}/releases/latest".format(owner, repo)
         
-        response = self.fetcher.fetch_and_parse_content(url)
+        response = self.fetcher.fetch_and_parse_content(url, max_age=max_age)
 
         if not response:
             raise ValueError("无法从 GitHub 获取发布信息。")
@@ -103,7 +106,7 @@ class Github:
             assets.append({
                 "product_name": self.extract_asset_name(file_name),
                 "id": asset.get("id"),
-                "url": "https://gitapi.simplehac.top/" + download_url,
+                "url": download_url,
                 "sha256": sha256
             })
             
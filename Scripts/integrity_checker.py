@@ -1,30 +1,183 @@
 import os
+import mmap
 import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
 from Scripts import utils
 
 class IntegrityChecker:
     def __init__(self, utils_instance=None):
         self.utils = utils_instance if utils_instance else utils.Utils()
+        # hashlib releases the GIL while hashing, so files are hashed on a thread pool
+        self.hash_workers = max(1, min(os.cpu_count() or 1, 8))
+        # Files at least this big are hashed with bigger reads, or mmap past mmap_threshold
+        self.large_file_size = 1024 * 1024
+        self.mmap_threshold = 16 * 1024 * 1024
 
     def get_sha256(self, file_path, block_size=65536):
         if not os.path.exists(file_path) or os.path.isdir(file_path):
             return None
 
+        return self.get_sha256_hasher(file_path, block_size).hexdigest()
+
+    def get_sha256_hasher(self, file_path=None, block_size=65536):
+        # Returns a hashlib object already fed with file_path (if any), so
+        # callers can keep updating it - e.g. while resuming a download
         sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                sha256.update(block)
-        return sha256.hexdigest()
+        if file_path and os.path.isfile(file_path):
+            file_size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                if file_size >= self.mmap_threshold:
+                    try:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                            sha256.update(mapped_file)
+                        return sha256
+                    except (OSError, ValueError):
+                        pass
+                if file_size >= self.large_file_size:
+                    block_size = max(block_size, 1024 * 1024)
+                for block in iter(lambda: f.read(block_size), b''):
+                    sha256.update(block)
+        return sha256
+
+    def get_sha256_many(self, file_paths):
+        # Hashes file_paths concurrently - the results keep the order of file_paths
+        if self.hash_workers < 2 or len(file_paths) < 2:
+            return [self.get_sha256(file_path) for file_path in file_paths]
+
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            return list(executor.map(self.get_sha256, file_paths))
+
+    def get_stat_cache_path(self, manifest_path):
+        # Sidecar next to the manifest holding the stat signature of every file
+        # as it was when last hashed, plus the directory digest tree (if any) -
+        # manifest.json itself keeps the flat format older builds read
+        return os.path.splitext(manifest_path)[0] + ".stat.json"
+
+    def get_stat_signature(self, file_stat):
+        return [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino or None]
+
+    def _read_stat_cache(self, manifest_path):
+        try:
+            stat_cache = self.utils.read_file(self.get_stat_cache_path(manifest_path))
+            if isinstance(stat_cache, dict) and stat_cache.get("manifest") == self.get_stat_signature(os.stat(manifest_path)):
+                return stat_cache
+        except Exception:
+            pass
+        # Missing, unreadable or written for another manifest
+        return {}
+
+    def _load_stat_cache(self, manifest_path):
+        return self._read_stat_cache(manifest_path).get("files", {})
+
+    def _save_stat_cache(self, manifest_path, file_signatures, manifest_tree=None):
+        try:
+            stat_cache = {
+                "manifest": self.get_stat_signature(os.stat(manifest_path)),
+                "files": file_signatures
+            }
+            if manifest_tree is not None:
+                stat_cache["tree"] = manifest_tree
+            self.utils.write_file(self.get_stat_cache_path(manifest_path), stat_cache, atomic=True)
+        except Exception as e:
+            self.utils.log_message("[INTEGRITY] Failed to write stat cache for {}: {}".format(manifest_path, e), level="WARNING")
+
+    def build_manifest_tree(self, manifest_data):
+        # Digest of every directory node, computed from its children (name, kind
+        # and digest), so a subtree is unchanged exactly when its digest is.
+        # Derived from the flat path -> sha256 map, so it works for old manifests too
+        children = {"": {}}
+        for relative_path, file_hash in manifest_data.items():
+            parts = relative_path.split("/")
+            for depth in range(len(parts) - 1):
+                parent = "/".join(parts[:depth])
+                directory = "/".join(parts[:depth + 1])
+                children.setdefault(parent, {})[parts[depth]] = ("d", directory)
+                children.setdefault(directory, {})
+            children["/".join(parts[:-1])][parts[-1]] = ("f", file_hash)
+
+        tree = {}
+        # Deepest directories first so every child digest is known before its parent
+        for directory in sorted(children, key=lambda d: d.count("/") + 1 if d else 0, reverse=True):
+            digest = hashlib.sha256()
+            for name in sorted(children[directory]):
+                kind, value = children[directory][name]
+                child_digest = tree[value] if kind == "d" else value
+                digest.update("{}\0{}\0{}\n".format(name, kind, child_digest).encode())
+            tree[directory] = digest.hexdigest()
+        return tree
+
+    def load_manifest(self, manifest_path):
+        # Returns (files, tree) - the tree comes from the stat sidecar while it
+        # still matches the manifest, or None. Manifests saved in the short-lived
+        # {"format": "tree"} layout are still accepted
+        manifest_data = self.utils.read_file(manifest_path)
+        if not isinstance(manifest_data, dict):
+            return None, None
+
+        if manifest_data.get("format") == "tree" and isinstance(manifest_data.get("files"), dict):
+            manifest_files = manifest_data["files"]
+            manifest_tree = manifest_data.get("tree")
+            if isinstance(manifest_tree, dict):
+                return manifest_files, manifest_tree
+            return manifest_files, self.build_manifest_tree(manifest_files)
+
+        manifest_tree = self._read_stat_cache(manifest_path).get("tree")
+        return manifest_data, manifest_tree if isinstance(manifest_tree, dict) else None
+
+    def get_changed_subtrees(self, expected_tree, current_tree, directory="", changed_files=()):
+        # Walks down from directory, skipping every subtree whose digest matches.
+        # A changed bundle (Lilu.kext, OpenCore.efi...) is reported as a whole,
+        # otherwise the deepest changed directories are ("." for the root)
+        if expected_tree.get(directory) == current_tree.get(directory):
+            return []
 
-    def generate_folder_manifest(self, folder_path, manifest_path=None, save_manifest=True):
+        name = directory.rsplit("/", 1)[-1]
+        if directory and os.path.splitext(name)[1]:
+            return [directory]
+
+        prefix = directory + "/" if directory else ""
+        subdirectories = sorted(set(
+            path for path in list(expected_tree) + list(current_tree)
+            if path.startswith(prefix) and path != directory and "/" not in path[len(prefix):]
+        ))
+
+        changed_subtrees = []
+        for subdirectory in subdirectories:
+            changed_subtrees.extend(self.get_changed_subtrees(expected_tree, current_tree, subdirectory, changed_files))
+
+        # Files directly in this directory changed as well
+        if not changed_subtrees or any(path.startswith(prefix) and "/" not in path[len(prefix):] for path in changed_files):
+            changed_subtrees.append(directory or ".")
+        return changed_subtrees
+
+    def _get_current_tree(self, manifest_files, issues, current_hashes):
+        # Rebuilds the tree for what is on disk, reusing the manifest digest for
+        # every file that was not found to differ
+        current_files = dict(manifest_files)
+        for relative_path in issues["missing"]:
+            current_files.pop(relative_path, None)
+        for relative_path in issues["modified"]:
+            current_files[relative_path] = current_hashes.get(relative_path) or "modified"
+        for relative_path in issues["untracked"]:
+            current_files[relative_path] = "untracked"
+        return self.build_manifest_tree(current_files)
+
+    def generate_folder_manifest(self, folder_path, manifest_path=None, save_manifest=True, tree=False):
+        """
+        The manifest is always the flat path -> sha256 map, which older builds
+        sharing OCK_Files can still read. tree=True also stores a digest per
+        directory in the stat sidecar.
+        """
         if not os.path.isdir(folder_path):
             return None
 
         if manifest_path is None:
             manifest_path = os.path.join(folder_path, "manifest.json")
 
+        stat_cache_name = os.path.basename(self.get_stat_cache_path(manifest_path))
         manifest_data = {}
+        file_signatures = {}
         for root, _, files in os.walk(folder_path):
             if '.git' in root or "__pycache__" in root:
                 continue
@@ -37,16 +190,26 @@ class IntegrityChecker:
                 
                 relative_path = os.path.relpath(file_path, folder_path).replace('\\', '/')
                 
-                if relative_path == os.path.basename(manifest_path):
+                if relative_path in (os.path.basename(manifest_path), stat_cache_name):
                     continue
 
-                manifest_data[relative_path] = self.get_sha256(file_path)
+                file_signatures[relative_path] = self.get_stat_signature(os.stat(file_path))
+                manifest_data[relative_path] = file_path
+
+        # Same keys in the same walk order as before, so the manifest is unchanged byte for byte
+        for relative_path, file_hash in zip(list(manifest_data), self.get_sha256_many(list(manifest_data.values()))):
+            manifest_data[relative_path] = file_hash
         
         if save_manifest:
-            self.utils.write_file(manifest_path, manifest_data)
+            self.utils.write_file(manifest_path, manifest_data, atomic=True)
+            self._save_stat_cache(manifest_path, file_signatures, self.build_manifest_tree(manifest_data) if tree else None)
         return manifest_data
 
-    def verify_folder_integrity(self, folder_path, manifest_path=None):
+    def verify_folder_integrity(self, folder_path, manifest_path=None, full_hash=False):
+        """
+        By default only files whose size, mtime or inode changed since they
+        were last hashed are hashed again. full_hash=True hashes every file.
+        """
         if not os.path.isdir(folder_path):
             return None, "Folder not found."
 
@@ -56,25 +219,31 @@ class IntegrityChecker:
         if not os.path.exists(manifest_path):
             return None, "Manifest file not found."
 
-        manifest_data = self.utils.read_file(manifest_path)
-        if not isinstance(manifest_data, dict):
+        manifest_data, manifest_tree = self.load_manifest(manifest_path)
+        if manifest_data is None:
             return None, "Invalid manifest file."
             
         issues = {
             "modified": [],
             "missing": [],
-            "untracked": []
+            "untracked": [],
+            "changed_subtrees": []
         }
 
         manifest_files = set(manifest_data.keys())
         actual_files = set()
 
+        stat_cache_name = os.path.basename(self.get_stat_cache_path(manifest_path))
+        stat_cache = {} if full_hash else self._load_stat_cache(manifest_path)
+        file_signatures = {}
+        files_to_hash = []
+
         for root, _, files in os.walk(folder_path):
             for name in files:
                 file_path = os.path.join(root, name)
                 relative_path = os.path.relpath(file_path, folder_path).replace('\\', '/')
 
-                if relative_path == os.path.basename(manifest_path):
+                if relative_path in (os.path.basename(manifest_path), stat_cache_name):
                     continue
                 
                 actual_files.add(relative_path)
@@ -82,13 +251,108 @@ class IntegrityChecker:
                 if relative_path not in manifest_data:
                     issues["untracked"].append(relative_path)
                 else:
-                    current_hash = self.get_sha256(file_path)
-                    if current_hash != manifest_data.get(relative_path):
-                        issues["modified"].append(relative_path)
+                    signature = self.get_stat_signature(os.stat(file_path))
+                    if stat_cache.get(relative_path) == signature:
+                        # Unchanged since it was last hashed against this manifest
+                        file_signatures[relative_path] = signature
+                        continue
+                    files_to_hash.append((relative_path, file_path, signature))
+
+        current_hashes = {}
+        for (relative_path, _, signature), current_hash in zip(files_to_hash, self.get_sha256_many([file_path for _, file_path, _ in files_to_hash])):
+            if current_hash != manifest_data.get(relative_path):
+                issues["modified"].append(relative_path)
+                current_hashes[relative_path] = current_hash
+            else:
+                file_signatures[relative_path] = signature
 
         missing_files = manifest_files - actual_files
         issues["missing"] = list(missing_files)
 
         is_valid = not any(issues.values())
+        if not is_valid:
+            if manifest_tree is None:
+                manifest_tree = self.build_manifest_tree(manifest_data)
+            changed_files = issues["modified"] + issues["missing"] + issues["untracked"]
+            issues["changed_subtrees"] = self.get_changed_subtrees(manifest_tree, self._get_current_tree(manifest_data, issues, current_hashes), changed_files=changed_files)
+
+        if file_signatures != stat_cache:
+            self._save_stat_cache(manifest_path, file_signatures, manifest_tree)
         
-        return is_valid, issues
\ No newline at end of file
+        return is_valid, issues
+
+    def verify_bundle_integrity(self, folder_path, bundle_path, manifest_path=None, full_hash=False):
+        """
+        Verifies only the files below bundle_path (relative to folder_path, e.g.
+        "Lilu.kext") against the manifest of folder_path.
+        """
+        if not os.path.isdir(folder_path):
+            return None, "Folder not found."
+
+        if manifest_path is None:
+            manifest_path = os.path.join(folder_path, "manifest.json")
+
+        if not os.path.exists(manifest_path):
+            return None, "Manifest file not found."
+
+        manifest_data, manifest_tree = self.load_manifest(manifest_path)
+        if manifest_data is None:
+            return None, "Invalid manifest file."
+        if manifest_tree is None:
+            manifest_tree = self.build_manifest_tree(manifest_data)
+
+        bundle_path = bundle_path.replace('\\', '/').strip('/')
+        if bundle_path not in manifest_tree:
+            return None, "Bundle not found in manifest."
+
+        prefix = bundle_path + "/"
+        bundle_files = {relative_path: file_hash for relative_path, file_hash in manifest_data.items() if relative_path.startswith(prefix)}
+
+        issues = {
+            "modified": [],
+            "missing": [],
+            "untracked": [],
+            "changed_subtrees": []
+        }
+
+        stat_cache = {} if full_hash else self._load_stat_cache(manifest_path)
+        file_signatures = dict(stat_cache)
+        actual_files = set()
+        files_to_hash = []
+
+        for root, _, files in os.walk(os.path.join(folder_path, bundle_path)):
+            for name in files:
+                file_path = os.path.join(root, name)
+                relative_path = os.path.relpath(file_path, folder_path).replace('\\', '/')
+                actual_files.add(relative_path)
+
+                if relative_path not in bundle_files:
+                    issues["untracked"].append(relative_path)
+                    continue
+
+                signature = self.get_stat_signature(os.stat(file_path))
+                if stat_cache.get(relative_path) != signature:
+                    files_to_hash.append((relative_path, file_path, signature))
+
+        current_hashes = {}
+        for (relative_path, _, signature), current_hash in zip(files_to_hash, self.get_sha256_many([file_path for _, file_path, _ in files_to_hash])):
+            if current_hash != bundle_files[relative_path]:
+                issues["modified"].append(relative_path)
+                current_hashes[relative_path] = current_hash
+                file_signatures.pop(relative_path, None)
+            else:
+                file_signatures[relative_path] = signature
+
+        issues["missing"] = list(set(bundle_files) - actual_files)
+
+        # The bundle is intact exactly when its rebuilt digest matches the manifest's
+        current_tree = self._get_current_tree(manifest_data, issues, current_hashes)
+        is_valid = current_tree.get(bundle_path) == manifest_tree.get(bundle_path)
+        if not is_valid:
+            changed_files = issues["modified"] + issues["missing"] + issues["untracked"]
+            issues["changed_subtrees"] = self.get_changed_subtrees(manifest_tree, current_tree, bundle_path, changed_files)
+
+        if not full_hash and file_signatures != stat_cache:
+            self._save_stat_cache(manifest_path, file_signatures, manifest_tree)
+
+        return is_valid, issues
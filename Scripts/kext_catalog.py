@@ -0,0 +1,136 @@
+from Scripts import utils
+import os
+import threading
+
+class KextCatalog:
+    """
+    Info.plist metadata of kext bundles, parsed on first use and kept until
+    the plist's size or mtime changes. Entries are shared - don't modify them.
+    """
+    def __init__(self, utils_instance=None):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # The first of these a personality has decides how it matches devices
+        self.matching_keys = [
+            "IOPCIMatch", 
+            "IONameMatch", 
+            "IOPCIPrimaryMatch", 
+            "idProduct", 
+            "idVendor", 
+            "HDAConfigDefault"
+        ]
+
+    def _find_plist(self, bundle_path):
+        # Almost every kext keeps it here - only walk the bundle otherwise
+        if os.path.isfile(os.path.join(bundle_path, "Contents", "Info.plist")):
+            return "Contents/Info.plist"
+        plist_paths = self.utils.find_matching_paths(bundle_path, extension_filter=".plist", name_filter="Info")
+        return plist_paths[0][0].replace("\\", "/") if plist_paths else None
+
+    def _get_signature(self, file_path):
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (file_stat.st_size, file_stat.st_mtime_ns)
+
+    def get(self, bundle_path):
+        """
+        Returns {PlistPath, BundleIdentifier, BundleVersion, BundleExecutable,
+        BundleLibraries, IOKitPersonalities} for the kext at bundle_path, or
+        None if it has no readable Info.plist.
+        """
+        bundle_path = os.path.abspath(bundle_path)
+        with self.lock:
+            entry = self.entries.get(bundle_path)
+        if entry and entry["signature"] == self._get_signature(os.path.join(bundle_path, entry["PlistPath"])):
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        plist_path = self._find_plist(bundle_path)
+        if not plist_path:
+            return None
+
+        signature = self._get_signature(os.path.join(bundle_path, plist_path))
+        try:
+            bundle_info = self.utils.read_file(os.path.join(bundle_path, plist_path))
+            entry = {
+                "signature": signature,
+                "PlistPath": plist_path,
+                "BundleIdentifier": bundle_info.get("CFBundleIdentifier"),
+                "BundleVersion": bundle_info.get("CFBundleVersion"),
+                "BundleExecutable": bundle_info.get("CFBundleExecutable"),
+                "BundleLibraries": dict(bundle_info.get("OSBundleLibraries", {})),
+                "IOKitPersonalities": bundle_info.get("IOKitPersonalities", {})
+            }
+        except Exception:
+            return None
+
+        with self.lock:
+            self.entries[bundle_path] = entry
+        return entry
+
+    def invalidate(self, bundle_path=None):
+        with self.lock:
+            if bundle_path is None:
+                self.entries = {}
+            else:
+                self.entries.pop(os.path.abspath(bundle_path), None)
+
+    def get_personality_device_ids(self, properties):
+        """
+        Returns (match_key, device_ids) for one IOKitPersonalities entry, with
+        the IDs written like the hardware report does ("8086-2723"), or
+        (None, []) if the personality doesn't match devices by ID.
+        """
+        matching_keys = [key for key in self.matching_keys if key in properties]
+        if not matching_keys:
+            return None, []
+
+        match_key = matching_keys[0]
+        device_ids = []
+
+        if match_key in ("IOPCIMatch", "IOPCIPrimaryMatch"):
+            for pci_id in properties[match_key].split(" "):
+                # "0x27238086&0xffffffff" - the mask doesn't matter here
+                pci_id = pci_id.split("&")[0]
+                if len(pci_id) != 10:
+                    continue
+                device_ids.append("{}-{}".format(pci_id[-4:], pci_id[2:6]).upper())
+        elif match_key == "IONameMatch":
+            name_matches = properties[match_key]
+            if not isinstance(name_matches, list):
+                name_matches = [name_matches]
+            for pci_id in name_matches:
+                # ACPI names like "PNP0C0A" don't identify a PCI device
+                if not pci_id.startswith("pci") or not "," in pci_id:
+                    continue
+                device_ids.append("{}-{}".format(pci_id[3:7], pci_id.split(",")[1].zfill(4)).upper())
+        elif match_key == "idProduct":
+            if "idVendor" in properties:
+                device_ids.append("{}-{}".format(self.utils.int_to_hex(properties["idVendor"]).zfill(4), self.utils.int_to_hex(properties["idProduct"]).zfill(4)).upper())
+        elif match_key == "HDAConfigDefault":
+            for codec_layout in properties[match_key]:
+                codec_id = self.utils.int_to_hex(codec_layout.get("CodecID")).zfill(8)
+                device_ids.append("{}-{}".format(codec_id[:4], codec_id[-4:]))
+
+        return match_key, device_ids
+
+    def get_matched_devices(self, bundle_path):
+        """
+        Returns [(personality_name, match_key, device_ids)] for the kext at
+        bundle_path. Personalities that can't be read are left out.
+        """
+        matched_devices = []
+        for personality_name, properties in ((self.get(bundle_path) or {}).get("IOKitPersonalities") or {}).items():
+            try:
+                match_key, device_ids = self.get_personality_device_ids(properties)
+            except Exception:
+                continue
+            if device_ids:
+                matched_devices.append((personality_name, match_key, device_ids))
+        return matched_devices
@@ -0,0 +1,174 @@
+from Scripts.datasets import kext_data
+from Scripts import utils
+from Scripts import kext_catalog
+import os
+
+class KextIndex:
+    """
+    Catalog of the kext bundles in OCK_Files: bundle name -> product -> paths
+    (relative to OCK_Files), and the reverse device ID -> (bundle name,
+    personality) taken from their IOKitPersonalities. It is saved next to the
+    product folders and a product is only walked again once its manifest (or
+    the folder) changed.
+    """
+    # Bumped whenever the saved layout changes, older files are rebuilt
+    index_version = 2
+
+    def __init__(self, ock_files_dir, utils_instance=None, kext_catalog_instance=None):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.kext_catalog = kext_catalog_instance if kext_catalog_instance else kext_catalog.KextCatalog(utils_instance=self.utils)
+        self.ock_files_dir = ock_files_dir
+        self.index_path = os.path.join(self.ock_files_dir, "kext_index.json")
+        self.products = None
+        self.bundles = {}
+        self.devices = {}
+
+    def _get_product_signature(self, product_dir):
+        # gather_bootloader_kexts rewrites the manifest of every product it
+        # updates, so the manifest stat tells whether the product changed
+        manifest_path = os.path.join(product_dir, "manifest.json")
+        try:
+            product_stat = os.stat(manifest_path if os.path.exists(manifest_path) else product_dir)
+        except OSError:
+            return None
+        return [product_stat.st_size, product_stat.st_mtime_ns]
+
+    def _scan_product(self, product_name):
+        bundles = {}
+        product_dir = os.path.join(self.ock_files_dir, product_name)
+        for root, dirs, _ in os.walk(product_dir):
+            for name in dirs:
+                if name.startswith(".") or not name.lower().endswith(".kext"):
+                    continue
+                relative_path = os.path.relpath(os.path.join(root, name), self.ock_files_dir).replace("\\", "/")
+                bundles.setdefault(os.path.splitext(name)[0], []).append(relative_path)
+        for paths in bundles.values():
+            paths.sort()
+        return bundles
+
+    def _scan_devices(self, bundles):
+        devices = {}
+        for bundle_name, paths in sorted(bundles.items()):
+            for relative_path in paths:
+                for personality_name, _, device_ids in self.kext_catalog.get_matched_devices(os.path.join(self.ock_files_dir, relative_path)):
+                    for device_id in device_ids:
+                        match = [bundle_name, personality_name]
+                        if match not in devices.setdefault(device_id, []):
+                            devices[device_id].append(match)
+        return devices
+
+    def _load(self):
+        index_data = None
+        try:
+            index_data = self.utils.read_file(self.index_path)
+        except Exception:
+            pass
+        if not isinstance(index_data, dict) or index_data.get("version") != self.index_version:
+            index_data = {}
+        self.products = index_data.get("products", {})
+
+    def _save(self):
+        try:
+            if os.path.isdir(self.ock_files_dir):
+                self.utils.write_file(self.index_path, {"version": self.index_version, "products": self.products}, atomic=True)
+        except Exception as e:
+            self.utils.log_message("[KEXT INDEX] Failed to save {}: {}".format(self.index_path, e), level="WARNING")
+
+    def refresh(self):
+        if self.products is None:
+            self._load()
+
+        product_names = []
+        if os.path.isdir(self.ock_files_dir):
+            product_names = [name for name in os.listdir(self.ock_files_dir) if not name.startswith(".") and os.path.isdir(os.path.join(self.ock_files_dir, name))]
+
+        changed = False
+        for product_name in set(self.products) - set(product_names):
+            del self.products[product_name]
+            changed = True
+
+        for product_name in product_names:
+            signature = self._get_product_signature(os.path.join(self.ock_files_dir, product_name))
+            product = self.products.get(product_name)
+            if product and product.get("signature") == signature:
+                continue
+            bundles = self._scan_product(product_name)
+            self.products[product_name] = {
+                "signature": signature,
+                "bundles": bundles,
+                "devices": self._scan_devices(bundles)
+            }
+            changed = True
+
+        if changed or not self.bundles:
+            self.bundles = {}
+            self.devices = {}
+            for product_name, product in sorted(self.products.items()):
+                for bundle_name, paths in product.get("bundles", {}).items():
+                    self.bundles.setdefault(bundle_name, {})[product_name] = paths
+                for device_id, matches in product.get("devices", {}).items():
+                    device_matches = self.devices.setdefault(device_id, [])
+                    for bundle_name, personality_name in matches:
+                        if (bundle_name, personality_name) not in device_matches:
+                            device_matches.append((bundle_name, personality_name))
+        if changed:
+            self._save()
+
+    def invalidate(self, product_name=None):
+        # Forces product_name (or everything) to be walked again on the next refresh
+        if self.products is None:
+            self._load()
+        if product_name is None:
+            self.products = {}
+        else:
+            self.products.pop(product_name, None)
+        self.bundles = {}
+        self.devices = {}
+
+    def get_bundle_paths(self, bundle_name):
+        """Every path of bundle_name across all products, sorted"""
+        return sorted(path for paths in self.bundles.get(bundle_name, {}).values() for path in paths)
+
+    def get_variants(self, bundle_name):
+        """
+        Products named bundle_name + suffix (e.g. AirportItlwm23.4), as
+        {suffix: path} - the per-Darwin builds of AirportItlwm.
+        """
+        variants = {}
+        for product_name, paths in sorted(self.bundles.get(bundle_name, {}).items()):
+            if product_name.startswith(bundle_name) and paths:
+                variants[product_name[len(bundle_name):]] = paths[0]
+        return variants
+
+    def get_device_matches(self, device_id):
+        """[(bundle name, personality name)] of every kext matching device_id ("8086-2723")"""
+        return list(self.devices.get(device_id.upper(), []))
+
+    def find_device_kexts(self, device_ids, categories=None, darwin_version=None):
+        """
+        Looks up all device_ids at once: {device_id: [kext_data.KextInfo]} of
+        the kexts from kext_data whose personalities match the device, in
+        kext_data order. With categories only kexts of those categories are
+        returned, with darwin_version only kexts supporting it. Devices
+        nothing matches are left out.
+        """
+        device_kexts = {}
+        for device_id in device_ids:
+            if not device_id or device_id in device_kexts:
+                continue
+
+            kext_indexes = set()
+            for bundle_name, _ in self.devices.get(device_id.upper(), []):
+                kext_index = kext_data.kext_index_by_name.get(bundle_name)
+                if kext_index is None:
+                    continue
+                kext = kext_data.kexts[kext_index]
+                if categories and kext.category not in categories:
+                    continue
+                if darwin_version and not darwin_version in kext.darwin_range:
+                    continue
+                kext_indexes.add(kext_index)
+
+            if kext_indexes:
+                device_kexts[device_id] = [kext_data.kexts[kext_index] for kext_index in sorted(kext_indexes)]
+        return device_kexts
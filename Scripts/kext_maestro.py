@@ -4,8 +4,11 @@ from Scripts.datasets import os_data
 from Scripts.datasets import pci_data
 from Scripts.datasets import codec_layouts
 from Scripts import utils
+from Scripts import integrity_checker
+from Scripts import kext_index
+from Scripts import efi_assembler
+from Scripts import kext_catalog
 import os
-import shutil
 import random
 import platform
 import sys
@@ -21,16 +24,10 @@ except NameError:
 from Scripts.custom_dialogs import show_options_dialog, show_info, show_confirmation, show_checklist_dialog
 
 class KextMaestro:
-    def __init__(self, utils_instance=None):
+    def __init__(self, utils_instance=None, integrity_checker_instance=None, efi_assembler_instance=None):
         self.utils = utils_instance if utils_instance else utils.Utils()
-        self.matching_keys = [
-            "IOPCIMatch", 
-            "IONameMatch", 
-            "IOPCIPrimaryMatch", 
-            "idProduct", 
-            "idVendor", 
-            "HDAConfigDefault"
-        ]
+        self.integrity_checker = integrity_checker_instance if integrity_checker_instance else integrity_checker.IntegrityChecker(utils_instance=self.utils)
+        self.efi_assembler = efi_assembler_instance if efi_assembler_instance else efi_assembler.EFIAssembler(utils_instance=self.utils)
         if getattr(sys, 'frozen', False):
             app_name = "SimpleKaruzi"
             if platform.system() == "Windows":
@@ -43,6 +40,9 @@ class KextMaestro:
             self.ock_files_dir = os.path.join(base_dir, app_name, "OCK_Files")
         else:
             self.ock_files_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "OCK_Files")
+        # Info.plist 只解析一次，之后 process_kext、modify_kexts 和 extract_pci_id 都从这里读取
+        self.kext_catalog = kext_catalog.KextCatalog(utils_instance=self.utils)
+        self.kext_index = kext_index.KextIndex(self.ock_files_dir, utils_instance=self.utils, kext_catalog_instance=self.kext_catalog)
         self.kexts = kext_data.kexts
     
     def _get_highlight_color(self):
@@ -53,42 +53,31 @@ class KextMaestro:
         if not os.path.exists(kext_path):
             return []
 
-        plist_path = os.path.join(kext_path, "Contents", "Info.plist")
-        plist_data = self.utils.read_file(plist_path)
-
         pci_ids = []
 
-        for personality_name, properties in plist_data.get("IOKitPersonalities", {}).items():
-            matching_keys = [key for key in self.matching_keys if key in properties]
-            
-            if not matching_keys:
-                continue
-            
-            match_key = matching_keys[0]
-
-            if match_key in ["IOPCIMatch", "IOPCIPrimaryMatch"]:
-                pci_list = properties[match_key].split(" ")
-                for pci_id in pci_list:
-                    vendor_id = pci_id[-4:]
-                    device_id = pci_id[2:6]
-                    pci_ids.append("{}-{}".format(vendor_id, device_id).upper())
-            elif match_key == "IONameMatch":
-                for pci_id in properties[match_key]:
-                    vendor_id = pci_id[3:7]
-                    device_id = pci_id.split(",")[1].zfill(4)
-                    pci_ids.append("{}-{}".format(vendor_id, device_id).upper())
-            elif match_key == "idProduct":
-                vendor_id = self.utils.int_to_hex(properties["idVendor"]).zfill(4)
-                device_id = self.utils.int_to_hex(properties["idProduct"]).zfill(4)
-                pci_ids.append("{}-{}".format(vendor_id, device_id).upper())
-            elif match_key == "HDAConfigDefault":
-                for codec_layout in properties[match_key]:
-                    codec_id = self.utils.int_to_hex(codec_layout.get("CodecID")).zfill(8)
-                    pci_ids.append("{}-{}".format(codec_id[:4], codec_id[-4:]))
+        for personality_name, match_key, device_ids in self.kext_catalog.get_matched_devices(kext_path):
+            pci_ids.extend(device_ids)
+            if match_key == "HDAConfigDefault":
                 pci_ids = sorted(list(set(pci_ids)))
 
         return pci_ids
 
+    def _get_unlisted_device_kexts(self, device_kexts, device_id):
+        """pci_data 尚未收录的设备：使用反向索引中匹配的 kext，每个冲突组只取第一个"""
+        kext_names = []
+        conflict_groups = set()
+
+        for kext in device_kexts.get(device_id, []):
+            if kext.conflict_group_id:
+                if kext.conflict_group_id in conflict_groups:
+                    continue
+                conflict_groups.add(kext.conflict_group_id)
+            kext_names.append(kext.name)
+
+        if kext_names:
+            self.utils.log_message("[KEXT MAESTRO] 设备 {} 未收录于 pci_data，根据 Kext 匹配信息选择: {}".format(device_id, ", ".join(kext_names)), level="INFO")
+        return kext_names
+
     def is_intel_hedt_cpu(self, processor_name, cpu_codename):
         if cpu_codename in cpu_data.IntelCPUGenerations[45:66]:
             return cpu_codename.endswith(("-X", "-P", "-W", "-E", "-EP", "-EX"))
@@ -147,7 +136,7 @@ class KextMaestro:
     def check_kext(self, index, target_darwin_version, allow_unsupported_kexts=False):
         kext = self.kexts[index]
 
-        if kext.checked or not (allow_unsupported_kexts or self.utils.parse_darwin_version(kext.min_darwin_version) <= self.utils.parse_darwin_version(target_darwin_version) <= self.utils.parse_darwin_version(kext.max_darwin_version)):
+        if kext.checked or not (allow_unsupported_kexts or target_darwin_version in kext.darwin_range):
             return
 
         kext.checked = True
@@ -168,6 +157,14 @@ class KextMaestro:
         for kext in self.kexts:
             kext.checked = kext.required
 
+        # 一次性在 OCK_Files 的反向索引中查找网卡、蓝牙和读卡器，用于 pci_data 尚未收录的设备
+        self.kext_index.refresh()
+        device_kexts = self.kext_index.find_device_kexts(
+            [device_props.get("Device ID") for device_type in ("Network", "Bluetooth", "SD Controller") for device_props in hardware_report.get(device_type, {}).values()],
+            categories=("Wi-Fi", "Ethernet", "Bluetooth", "Card Reader"),
+            darwin_version=macos_version
+        )
+
         selected_kexts = ["UTBDefault"]
 
         if "Intel" in hardware_report.get("CPU").get("Manufacturer"):
@@ -373,6 +370,8 @@ class KextMaestro:
                 selected_kexts.append("CatalinaBCM5701Ethernet")
             elif device_id in pci_data.IntelX500IDs:
                 selected_kexts.append("IntelLucy")
+            elif device_id not in pci_data.WirelessCardIDs + pci_data.EthernetIDs + pci_data.WirelessUSBIDs:
+                selected_kexts.extend(self._get_unlisted_device_kexts(device_kexts, device_id))
 
         if all(network_props.get("Bus Type") == "USB" for network_props in hardware_report.get("Network", {}).values()):
             selected_kexts.append("NullEthernet")
@@ -388,6 +387,8 @@ class KextMaestro:
                 selected_kexts.append("IntelBluetoothFirmware")
             elif usb_id in pci_data.BluetoothIDs[-1]:
                 selected_kexts.append("BlueToolFixup")
+            elif usb_id not in pci_data.BluetoothIDs:
+                selected_kexts.extend(self._get_unlisted_device_kexts(device_kexts, usb_id))
 
         if "Laptop" in hardware_report.get("Motherboard").get("Platform"):
             if "SURFACE" in hardware_report.get("Motherboard").get("Name"):
@@ -433,6 +434,8 @@ class KextMaestro:
                     selected_kexts.append("Sinetek-rtsx")
                 else:
                     selected_kexts.append("RealtekCardReader")
+            else:
+                selected_kexts.extend(self._get_unlisted_device_kexts(device_kexts, controller_props.get("Device ID")))
         
         for controller_name, controller_props in hardware_report.get("Storage Controllers", {}).items():
             if "NVMe" in controller_name or "NVM Express" in controller_name:
@@ -469,27 +472,29 @@ class KextMaestro:
         return needs_oclp, audio_layout_id, audio_controller_properties
 
     def install_kexts_to_efi(self, macos_version, kexts_directory):
+        # 只遍历一次 OCK_Files（并且只有产品有变化时才遍历），之后按名称直接查找
+        self.kext_index.refresh()
+
         for kext in self.kexts:
             if kext.checked:
                 try:
                     source_kext_path = destination_kext_path = None
 
-                    kext_paths = self.utils.find_matching_paths(self.ock_files_dir, extension_filter=".kext", name_filter=kext.name)
-                    for kext_path, type in kext_paths:
-                        if "AirportItlwm" == kext.name:
-                            version = macos_version[:2]
-                            if all((self.kexts[kext_data.kext_index_by_name.get("IOSkywalkFamily")].checked, self.kexts[kext_data.kext_index_by_name.get("IO80211FamilyLegacy")].checked)) or self.utils.parse_darwin_version("24.0.0") <= self.utils.parse_darwin_version(macos_version):
-                                version = "22"
-                            elif self.utils.parse_darwin_version("23.4.0") <= self.utils.parse_darwin_version(macos_version):
-                                version = "23.4"
-                            elif self.utils.parse_darwin_version("23.0.0") <= self.utils.parse_darwin_version(macos_version):
-                                version = "23.0"
-                            
-                            if version in kext_path:
-                                source_kext_path = os.path.join(self.ock_files_dir, kext_path)
-                                destination_kext_path = os.path.join(kexts_directory, os.path.basename(kext_path))
-                                break
-                        else:
+                    if "AirportItlwm" == kext.name:
+                        version = macos_version[:2]
+                        if all((self.kexts[kext_data.kext_index_by_name.get("IOSkywalkFamily")].checked, self.kexts[kext_data.kext_index_by_name.get("IO80211FamilyLegacy")].checked)) or self.utils.parse_darwin_version("24.0.0") <= self.utils.parse_darwin_version(macos_version):
+                            version = "22"
+                        elif self.utils.parse_darwin_version("23.4.0") <= self.utils.parse_darwin_version(macos_version):
+                            version = "23.4"
+                        elif self.utils.parse_darwin_version("23.0.0") <= self.utils.parse_darwin_version(macos_version):
+                            version = "23.0"
+
+                        kext_path = self.kext_index.get_variants(kext.name).get(version)
+                        if kext_path:
+                            source_kext_path = os.path.join(self.ock_files_dir, kext_path)
+                            destination_kext_path = os.path.join(kexts_directory, os.path.basename(kext_path))
+                    else:
+                        for kext_path in self.kext_index.get_bundle_paths(kext.name):
                             main_kext = kext_path.split("/")[0]
                             main_kext_index = kext_data.kext_index_by_name.get(main_kext)
                             if not main_kext_index or self.kexts[main_kext_index].checked:
@@ -497,22 +502,34 @@ class KextMaestro:
                                     source_kext_path = os.path.join(self.ock_files_dir, kext_path)
                                     destination_kext_path = os.path.join(kexts_directory, os.path.basename(kext_path))
                     
-                    if os.path.exists(source_kext_path):
-                        shutil.copytree(source_kext_path, destination_kext_path, dirs_exist_ok=True)
+                    if os.path.exists(source_kext_path) and self.verify_kext_bundle(source_kext_path):
+                        self.efi_assembler.copy_tree(source_kext_path, destination_kext_path)
                 except:
                     continue
 
-    def process_kext(self, kexts_directory, kext_path):
-        try:
-            plist_path = self.utils.find_matching_paths(os.path.join(kexts_directory, kext_path), extension_filter=".plist", name_filter="Info")[0][0]
-            bundle_info = self.utils.read_file(os.path.join(kexts_directory, kext_path, plist_path))
+    def verify_kext_bundle(self, kext_path):
+        """只校验即将复制的 kext，而不是整个产品目录"""
+        relative_path = os.path.relpath(kext_path, self.ock_files_dir).replace("\\", "/")
+        product_name, _, bundle_path = relative_path.partition("/")
+        if not bundle_path:
+            return True
 
-            if isinstance(bundle_info.get("CFBundleIdentifier", None), (str, unicode)):
-                pass
-        except:
+        is_valid, issues = self.integrity_checker.verify_bundle_integrity(os.path.join(self.ock_files_dir, product_name), bundle_path)
+        if is_valid is None:
+            # 没有 manifest（或 kext 不在 manifest 中）时无法校验，保持原有行为
+            return True
+
+        if not is_valid:
+            self.utils.log_message("[KEXT MAESTRO] {} 校验失败，已跳过: {}".format(bundle_path, ", ".join(issues["changed_subtrees"])), level="ERROR", to_build_log=True)
+        return is_valid
+
+    def process_kext(self, kexts_directory, kext_path):
+        bundle_metadata = self.kext_catalog.get(os.path.join(kexts_directory, kext_path))
+        if not bundle_metadata:
             return None
 
-        executable_path = os.path.join("Contents", "MacOS", bundle_info.get("CFBundleExecutable", "None"))
+        plist_path = bundle_metadata.get("PlistPath")
+        executable_path = os.path.join("Contents", "MacOS", bundle_metadata.get("BundleExecutable") or "None")
         if not os.path.exists(os.path.join(kexts_directory, kext_path, executable_path)):
             executable_path = ""
         
@@ -521,16 +538,22 @@ class KextMaestro:
             "Enabled": True,
             "ExecutablePath": executable_path.replace("\\", "/").lstrip("/"),
             "PlistPath": plist_path.replace("\\", "/").lstrip("/"),
-            "BundleIdentifier": bundle_info.get("CFBundleIdentifier"),
-            "BundleVersion": bundle_info.get("CFBundleVersion"),
-            "BundleLibraries": {
-                bundle_identifier: bundle_version
-                for bundle_identifier, bundle_version in bundle_info.get("OSBundleLibraries", {}).items() 
-            }
+            "BundleIdentifier": bundle_metadata.get("BundleIdentifier"),
+            "BundleVersion": bundle_metadata.get("BundleVersion"),
+            "BundleLibraries": dict(bundle_metadata.get("BundleLibraries"))
         }
 
     def modify_kexts(self, plist_path, hardware_report, macos_version):
         try:
+            # 先用缓存的 personalities 判断是否需要修改，只有需要修改时才读取完整的 plist
+            bundle_path = os.path.dirname(plist_path)
+            if os.path.basename(bundle_path) == "Contents":
+                bundle_path = os.path.dirname(bundle_path)
+            bundle_metadata = self.kext_catalog.get(bundle_path) or {}
+            personalities = bundle_metadata.get("IOKitPersonalities") or {}
+            if not ((personalities.get("itlwm") or {}).get("WiFiConfig") or personalities.get("VoodooTSCSync") or personalities.get("AmdTscSync")):
+                return
+
             bundle_info = self.utils.read_file(plist_path)
 
             if bundle_info.get("IOKitPersonalities").get("itlwm").get("WiFiConfig"):
@@ -665,17 +688,13 @@ class KextMaestro:
             incompatible_kexts = [
                 (self.kexts[index].name, "Lilu" in self.kexts[index].requires_kexts)
                 for index in selected_kexts
-                if not self.utils.parse_darwin_version(self.kexts[index].min_darwin_version)
-                <= self.utils.parse_darwin_version(target_darwin_version)
-                <= self.utils.parse_darwin_version(self.kexts[index].max_darwin_version)
+                if not target_darwin_version in self.kexts[index].darwin_range
             ]
         except:
             incompatible_kexts = [
                 (self.kexts[kext_data.kext_index_by_name.get(kext_name)].name, "Lilu" in self.kexts[kext_data.kext_index_by_name.get(kext_name)].requires_kexts)
                 for kext_name in selected_kexts
-                if not self.utils.parse_darwin_version(self.kexts[kext_data.kext_index_by_name.get(kext_name)].min_darwin_version)
-                <= self.utils.parse_darwin_version(target_darwin_version)
-                <= self.utils.parse_darwin_version(self.kexts[kext_data.kext_index_by_name.get(kext_name)].max_darwin_version)
+                if not target_darwin_version in self.kexts[kext_data.kext_index_by_name.get(kext_name)].darwin_range
             ]
 
         if not incompatible_kexts:
@@ -714,7 +733,7 @@ class KextMaestro:
         checklist_items = []
         
         for kext in self.kexts:
-            is_supported = self.utils.parse_darwin_version(kext.min_darwin_version) <= self.utils.parse_darwin_version(macos_version) <= self.utils.parse_darwin_version(kext.max_darwin_version)
+            is_supported = macos_version in kext.darwin_range
             
             display_text = "{} - {}".format(kext.name, kext.description)
             if not is_supported:
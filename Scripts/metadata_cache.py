@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import platform
+from Scripts import utils
+
+class MetadataCache:
+    def __init__(self, utils_instance=None, cache_dir=None, ttl=600):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.cache_dir = cache_dir if cache_dir else self._get_default_cache_dir()
+        # Seconds a cached response is served without asking the server again -
+        # after that it is revalidated with If-None-Match/If-Modified-Since
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _get_default_cache_dir(self):
+        if getattr(sys, 'frozen', False):
+            app_name = "SimpleKaruzi"
+            if platform.system() == "Windows":
+                base_dir = os.environ.get("APPDATA", os.path.expanduser("~"))
+            elif platform.system() == "Darwin":
+                base_dir = os.path.expanduser("~/Library/Application Support")
+            else:
+                base_dir = os.path.expanduser("~/.config")
+
+            return os.path.join(base_dir, app_name, "HTTP_Cache")
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "HTTP_Cache")
+
+    def _entry_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._entry_path(url), "r") as f:
+                entry = json.load(f)
+            if entry.get("url") != url:
+                return None
+            entry["content"] = base64.b64decode(entry["content"])
+            return entry
+        except Exception:
+            return None
+
+    def is_fresh(self, entry, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        return bool(entry) and max_age > 0 and time.time() - entry.get("fetched_at", 0) < max_age
+
+    def get_conditional_headers(self, entry):
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, content, etag=None, last_modified=None):
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "content": base64.b64encode(content).decode("ascii")
+        }
+        return self._write(url, entry)
+
+    def touch(self, entry):
+        # A 304 means the cached body is still current - restart its TTL
+        entry = dict(entry)
+        entry["fetched_at"] = time.time()
+        entry["content"] = base64.b64encode(entry["content"]).decode("ascii")
+        return self._write(entry["url"], entry)
+
+    def _write(self, url, entry):
+        entry_path = self._entry_path(url)
+        try:
+            self.utils.create_folder(self.cache_dir)
+            temp_path = entry_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, entry_path)
+        except Exception as e:
+            self.utils.log_message("[HTTP CACHE] Failed to write cache entry for {}: {}".format(url, e), level="WARNING")
+            return False
+        return True
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".json", ".tmp")):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses
+        }
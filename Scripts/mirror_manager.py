@@ -0,0 +1,263 @@
+from Scripts import utils
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if sys.version_info >= (3, 0):
+    from urllib.parse import urlsplit
+    from urllib.error import HTTPError
+else:
+    from urlparse import urlsplit
+    from urllib2 import HTTPError
+
+# Every rule rewrites the URLs starting with one of its "match" prefixes into
+# one URL per mirror - "{url}" stands for the original URL, so "{url}" alone
+# means downloading directly
+DEFAULT_MIRROR_RULES = [
+    {
+        "match": ["https://github.com/", "https://raw.githubusercontent.com/"],
+        "mirrors": ["https://gitapi.simplehac.top/{url}", "{url}"]
+    }
+]
+
+class PrefetchedResponse:
+    """
+    A response whose first bytes were already read while racing mirrors -
+    read() hands them out before the rest of the body.
+    """
+    def __init__(self, response, prefix=b"", mirror=None):
+        self.response = response
+        self.prefix = prefix
+        self.mirror = mirror
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self, amt=None):
+        if self.prefix:
+            if amt is None:
+                data, self.prefix = self.prefix + self.response.read(), b""
+                return data
+            data, self.prefix = self.prefix[:amt], self.prefix[amt:]
+            return data
+        return self.response.read() if amt is None else self.response.read(amt)
+
+    def close(self):
+        self.prefix = b""
+        self.response.close()
+
+class MirrorManager:
+    def __init__(self, utils_instance=None, rules=None, half_life=600, race_width=2, probe_size=64 * 1024):
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.rules = rules if rules else DEFAULT_MIRROR_RULES
+        # Seconds after which a measurement only counts half - old results
+        # fade back towards the defaults so a mirror that was slow gets retried
+        self.half_life = half_life
+        # How many of the best ranked mirrors are raced for each request
+        self.race_width = race_width
+        self.probe_size = probe_size
+        # Assumed for mirrors without (recent) measurements
+        self.default_latency = 1.0
+        self.default_throughput = 1024 * 1024
+        self.failure_penalty = 10.0
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _find_rule(self, url):
+        for rule in self.rules:
+            if any(url.startswith(prefix) for prefix in rule.get("match", [])):
+                return rule
+        return None
+
+    def get_origin_url(self, url):
+        # Undoes a mirror rewrite, so URLs stored with a mirror prefix (e.g. in
+        # the download history) are treated like the original URL
+        for rule in self.rules:
+            for mirror in rule.get("mirrors", []):
+                prefix = mirror.split("{url}", 1)[0]
+                if prefix and url.startswith(prefix) and self._find_rule(url[len(prefix):]) is rule:
+                    return url[len(prefix):]
+        return url
+
+    def _get_host(self, url):
+        return urlsplit(self.get_origin_url(url)).hostname
+
+    def _get_score(self, host, mirror, current_time):
+        # Estimated seconds until a 1MB file is downloaded, lower is better
+        default_score = self.default_latency + 1024 * 1024 / self.default_throughput
+        stat = self.stats.get((host, mirror))
+        if not stat:
+            return default_score
+
+        latency = stat["latency"] if stat["latency"] is not None else self.default_latency
+        throughput = stat["throughput"] or self.default_throughput
+        score = latency + 1024 * 1024 / throughput + stat["failures"] * self.failure_penalty
+
+        weight = 0.5 ** ((current_time - stat["updated"]) / self.half_life)
+        return weight * score + (1 - weight) * default_score
+
+    def get_candidates(self, url):
+        """
+        Returns [(mirror, mirror_url)] for url, fastest first. URLs no rule
+        matches are returned as they are, with None as the mirror.
+        """
+        origin_url = self.get_origin_url(url)
+        rule = self._find_rule(origin_url)
+        if not rule or not rule.get("mirrors"):
+            return [(None, url)]
+
+        host = urlsplit(origin_url).hostname
+        current_time = time.time()
+        with self.lock:
+            mirrors = sorted(rule["mirrors"], key=lambda mirror: self._get_score(host, mirror, current_time))
+        return [(mirror, mirror.replace("{url}", origin_url)) for mirror in mirrors]
+
+    def record(self, url, mirror, latency=None, throughput=None, failed=False):
+        if mirror is None:
+            return
+
+        key = (self._get_host(url), mirror)
+        with self.lock:
+            stat = self.stats.setdefault(key, {"latency": None, "throughput": None, "failures": 0, "updated": 0})
+            if failed:
+                stat["failures"] += 1
+            else:
+                # Smooth out single slow or fast requests
+                if latency is not None:
+                    stat["latency"] = latency if stat["latency"] is None else (stat["latency"] + latency) / 2
+                if throughput:
+                    stat["throughput"] = throughput if not stat["throughput"] else (stat["throughput"] + throughput) / 2
+                stat["failures"] = 0
+            stat["updated"] = time.time()
+
+    def needs_probe(self, url):
+        candidates = self.get_candidates(url)
+        if len(candidates) < 2:
+            return False
+
+        host = self._get_host(url)
+        current_time = time.time()
+        with self.lock:
+            return not any(
+                current_time - self.stats[(host, mirror)]["updated"] < self.half_life
+                for mirror, _ in candidates if (host, mirror) in self.stats
+            )
+
+    def _is_mirror_failure(self, error):
+        # "Range Not Satisfiable" answers a resumed download whose partial
+        # file is stale - the mirror itself works fine
+        return not (isinstance(error, HTTPError) and error.code == 416)
+
+    def _open_first_bytes(self, opener, url, headers=None):
+        start_time = time.time()
+        try:
+            response = opener(url, headers)
+        except HTTPError as e:
+            if e.code != 304:
+                raise
+            # "Not Modified" counts as an answer
+            response = e
+        first_bytes = response.read(1)
+        return response, first_bytes, time.time() - start_time
+
+    def probe(self, url, opener):
+        """
+        Measures latency and throughput of every mirror for url by fetching
+        its first probe_size bytes from all of them at once.
+        opener(url, headers) must return a urlopen-like response.
+        """
+        candidates = self.get_candidates(url)
+        if len(candidates) < 2:
+            return candidates
+
+        def probe_mirror(mirror, mirror_url):
+            try:
+                response, first_bytes, latency = self._open_first_bytes(opener, mirror_url, {"Range": "bytes=0-{}".format(self.probe_size - 1)})
+                with response:
+                    start_time = time.time()
+                    received = len(first_bytes) + len(response.read(self.probe_size - 1))
+                    elapsed = time.time() - start_time
+                self.record(url, mirror, latency=latency, throughput=received / elapsed if received > 1 and elapsed > 0 else None)
+            except Exception as e:
+                self.record(url, mirror, failed=self._is_mirror_failure(e))
+                self.utils.log_message("[MIRROR] Probe of {} failed: {}".format(mirror_url, e), level="WARNING")
+
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            for mirror, mirror_url in candidates:
+                executor.submit(probe_mirror, mirror, mirror_url)
+
+        candidates = self.get_candidates(url)
+        self.utils.log_message("[MIRROR] Fastest mirror for {}: {}".format(self._get_host(url), candidates[0][0]), level="INFO")
+        return candidates
+
+    def race(self, url, opener, exclude=(), race_width=None):
+        """
+        Opens the best ranked mirrors for url at once and returns a
+        PrefetchedResponse for the first one whose first bytes arrive; the
+        others are closed. exclude - mirrors that already failed for url.
+        race_width - overrides self.race_width, 1 only opens the best mirror.
+        """
+        candidates = [candidate for candidate in self.get_candidates(url) if candidate[0] not in exclude] or self.get_candidates(url)
+        candidates = candidates[:max(1, race_width or self.race_width)]
+
+        if len(candidates) == 1:
+            mirror, mirror_url = candidates[0]
+            try:
+                response, first_bytes, latency = self._open_first_bytes(opener, mirror_url)
+            except Exception as e:
+                # Ranks the mirror down, so a retry goes to the next one
+                if self._is_mirror_failure(e):
+                    self.record(url, mirror, failed=True)
+                raise
+            self.record(url, mirror, latency=latency)
+            return PrefetchedResponse(response, first_bytes, mirror)
+
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = {executor.submit(self._open_first_bytes, opener, mirror_url): mirror for mirror, mirror_url in candidates}
+        winner = None
+        last_error = None
+        finished = set()
+        try:
+            for future in as_completed(futures):
+                mirror = futures[future]
+                finished.add(future)
+                try:
+                    response, first_bytes, latency = future.result()
+                except Exception as e:
+                    last_error = e
+                    if self._is_mirror_failure(e):
+                        self.record(url, mirror, failed=True)
+                    continue
+                self.record(url, mirror, latency=latency)
+                winner = (future, PrefetchedResponse(response, first_bytes, mirror))
+                break
+        finally:
+            # Losers are measured and closed whenever they finish
+            for future, mirror in futures.items():
+                if future not in finished:
+                    future.add_done_callback(lambda future, mirror=mirror: self._discard(url, mirror, future))
+            executor.shutdown(wait=False)
+
+        if winner is None:
+            raise last_error
+        return winner[1]
+
+    def _discard(self, url, mirror, future):
+        try:
+            response, _, latency = future.result()
+        except Exception as e:
+            if self._is_mirror_failure(e):
+                self.record(url, mirror, failed=True)
+            return
+        self.record(url, mirror, latency=latency)
+        try:
+            response.close()
+        except Exception:
+            pass
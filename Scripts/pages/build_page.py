@@ -1,6 +1,5 @@
 import platform
 import os
-import shutil
 import threading
 
 from PyQt6.QtCore import Qt, pyqtSignal
@@ -192,6 +191,18 @@ class BuildPage(ScrollArea):
     def _connect_signals(self):
         self.build_progress_signal.connect(self._handle_build_progress)
         self.build_complete_signal.connect(self._handle_build_complete)
+        self.controller.backend.download_progress_signal.connect(self._handle_download_progress)
+
+    def _handle_download_progress(self, event):
+        # 资源下载发生在 EFI 构建步骤之前，占用进度条的前 40%
+        if not self.build_in_progress or not hasattr(self, "progress_helper"):
+            return
+        
+        if event.done:
+            message = "资源下载完成"
+        else:
+            message = "正在下载资源: {}".format(event.describe())
+        self.progress_helper.update("loading", message, int(event.percent * 0.4))
 
     def _handle_build_progress(self, title, steps, current_step_index, progress, done):
         status = "success" if done else "loading"
@@ -294,11 +305,11 @@ class BuildPage(ScrollArea):
 
     def _build_opencore_efi(self, hardware_report, disabled_devices, smbios_model, macos_version, needs_oclp):
         steps = [
-            "正在复制 EFI 基础文件到结果文件夹",
+            "正在读取 EFI 基础配置",
             "正在应用 ACPI 补丁",
             "正在复制驱动 (Kexts) 并创建 config.plist 快照",
             "正在生成 config.plist",
-            "正在清理未使用的驱动、资源和工具"
+            "正在复制所需的驱动、资源和工具"
         ]
         
         title = "构建 OpenCore EFI"
@@ -314,14 +325,14 @@ class BuildPage(ScrollArea):
         if not os.path.exists(backend.k.ock_files_dir):
             raise Exception("目录 \"{}\" 不存在。".format(backend.k.ock_files_dir))
         
+        # 先只读取模板 config.plist，生成 config.plist 之后再按其内容只放入需要的文件
         source_efi_dir = os.path.join(backend.k.ock_files_dir, "OpenCorePkg")
-        shutil.copytree(source_efi_dir, backend.result_dir, dirs_exist_ok=True)
-
+        source_config_file = os.path.join(source_efi_dir, "EFI", "OC", "config.plist")
         config_file = os.path.join(backend.result_dir, "EFI", "OC", "config.plist")
-        config_data = backend.u.read_file(config_file)
+        config_data = backend.u.read_file(source_config_file)
         
         if not config_data:
-            raise Exception("错误：文件 {} 不存在。".format(config_file))
+            raise Exception("错误：文件 {} 不存在。".format(source_config_file))
         
         progress = int((current_step / len(steps)) * 100)
         self.build_progress_signal.emit(title, steps, current_step, progress, False)
@@ -339,6 +350,7 @@ class BuildPage(ScrollArea):
             backend.ac.acpi_directory = acpi_directory
             backend.ac.smbios_model = smbios_model
             backend.ac.lpc_bus_device = backend.ac.get_lpc_name()
+            backend.ac.begin_ssdt_batch()
             
             for patch in backend.ac.patches:
                 if patch.checked:
@@ -354,6 +366,12 @@ class BuildPage(ScrollArea):
                     config_data["ACPI"]["Add"].extend(acpi_load.get("Add", []))
                     config_data["ACPI"]["Delete"].extend(acpi_load.get("Delete", []))
                     config_data["ACPI"]["Patch"].extend(acpi_load.get("Patch", []))
+
+            ssdt_results = backend.ac.compile_queued_ssdts()
+            for acpi_add in config_data["ACPI"]["Add"]:
+                ssdt_name = os.path.splitext(acpi_add.get("Path", ""))[0]
+                if ssdt_results.get(ssdt_name) is False:
+                    acpi_add["Enabled"] = False
         
         config_data["ACPI"]["Patch"].extend(backend.ac.dsdt_patches)
         config_data["ACPI"]["Patch"] = backend.ac.apply_acpi_patches(config_data["ACPI"]["Patch"])
@@ -385,56 +403,15 @@ class BuildPage(ScrollArea):
             audio_controller_properties
         )
         
-        backend.u.write_file(config_file, config_data)
-
         progress = int((current_step / len(steps)) * 100)
         self.build_progress_signal.emit(title, steps, current_step, progress, False)
-        files_to_remove = []
-
-        drivers_directory = os.path.join(backend.result_dir, "EFI", "OC", "Drivers")
-        driver_list = backend.u.find_matching_paths(drivers_directory, extension_filter=".efi")
-        driver_loaded = [kext.get("Path") for kext in config_data.get("UEFI").get("Drivers")]
-        for driver_path, type in driver_list:
-            if not driver_path in driver_loaded:
-                files_to_remove.append(os.path.join(drivers_directory, driver_path))
-
-        resources_audio_dir = os.path.join(backend.result_dir, "EFI", "OC", "Resources", "Audio")
-        if os.path.exists(resources_audio_dir):
-            files_to_remove.append(resources_audio_dir)
-
-        picker_variant = config_data.get("Misc", {}).get("Boot", {}).get("PickerVariant")
-        if picker_variant in (None, "Auto"):
-            picker_variant = "Acidanthera/GoldenGate" 
-        if os.name == "nt":
-            picker_variant = picker_variant.replace("/", "\\")
-
-        resources_image_dir = os.path.join(backend.result_dir, "EFI", "OC", "Resources", "Image")
-        available_picker_variants = backend.u.find_matching_paths(resources_image_dir, type_filter="dir")
-
-        for variant_name, variant_type in available_picker_variants:
-            variant_path = os.path.join(resources_image_dir, variant_name)
-            if ".icns" in ", ".join(os.listdir(variant_path)):
-                if picker_variant not in variant_name:
-                    files_to_remove.append(variant_path)
-
-        tools_directory = os.path.join(backend.result_dir, "EFI", "OC", "Tools")
-        tool_list = backend.u.find_matching_paths(tools_directory, extension_filter=".efi")
-        tool_loaded = [tool.get("Path") for tool in config_data.get("Misc").get("Tools")]
-        for tool_path, type in tool_list:
-            if not tool_path in tool_loaded:
-                files_to_remove.append(os.path.join(tools_directory, tool_path))
-
-        if "manifest.json" in os.listdir(backend.result_dir):
-            files_to_remove.append(os.path.join(backend.result_dir, "manifest.json"))
-
-        for file_path in files_to_remove:
-            try:
-                if os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                else:
-                    os.remove(file_path)
-            except Exception as e:
-                backend.u.log_message("[构建] 无法删除文件 {}: {}".format(os.path.basename(file_path), e), level="WARNING", to_build_log=True)
+
+        # 只放入 config.plist 实际加载的驱动和工具、所选的启动界面主题，不再整体复制后删除
+        directories, files = backend.efi_assembler.plan_opencore_files(source_efi_dir, config_data)
+        backend.efi_assembler.materialize(source_efi_dir, backend.result_dir, directories, files)
+        backend.efi_assembler.log_stats()
+
+        backend.u.write_file(config_file, config_data)
         
         self.build_progress_signal.emit(title, steps, len(steps) - 1, 100, True)
 
@@ -0,0 +1,84 @@
+import time
+import threading
+from dataclasses import dataclass
+
+@dataclass
+class ProgressEvent:
+    source: str
+    completed: int
+    total: int = 0
+    speed: float = 0.0
+    message: str = ""
+    done: bool = False
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.done else 0
+        return min(100, int(self.completed * 100 / self.total))
+
+    def describe(self):
+        if self.speed < 1024 * 1024:
+            speed_str = "{:.1f} KB/s".format(self.speed / 1024)
+        else:
+            speed_str = "{:.1f} MB/s".format(self.speed / (1024 * 1024))
+
+        if self.total:
+            text = "{} {:3d}% {:.1f}/{:.1f}MB".format(speed_str, self.percent, self.completed / (1024 * 1024), self.total / (1024 * 1024))
+        else:
+            text = "{} {:.1f}MB".format(speed_str, self.completed / (1024 * 1024))
+
+        return "{} {}".format(self.message, text) if self.message else text
+
+class ProgressChannel:
+    """
+    Carries progress events from downloads to whatever displays them. Events
+    are coalesced per source so listeners see at most one update per interval,
+    plus the final one.
+    """
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.listeners = []
+        self.sources = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def publish(self, source, completed, total=None, message="", done=False):
+        current_time = time.time()
+        with self.lock:
+            state = self.sources.get(source)
+            if state is None or completed < state["last_completed"]:
+                # New transfer (or restarted from zero) - measure speed from here
+                state = self.sources[source] = {
+                    "start_time": current_time,
+                    "start_completed": completed,
+                    "last_emit": 0,
+                    "last_completed": completed
+                }
+            state["last_completed"] = completed
+
+            if not done and current_time - state["last_emit"] < self.interval:
+                return
+            state["last_emit"] = current_time
+
+            elapsed = current_time - state["start_time"]
+            speed = (completed - state["start_completed"]) / elapsed if elapsed > 0 else 0.0
+            if done:
+                self.sources.pop(source, None)
+            listeners = list(self.listeners)
+
+        event = ProgressEvent(source, completed, total or 0, speed, message, done)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                pass
@@ -1,4 +1,7 @@
 from Scripts import integrity_checker
+from Scripts import metadata_cache
+from Scripts import mirror_manager
+from Scripts import progress_channel
 from Scripts import utils
 import ssl
 import os
@@ -9,25 +12,271 @@ import sys
 import gzip
 import zlib
 import time
+import threading
+from io import BytesIO
 
 if sys.version_info >= (3, 0):
-    from urllib.request import urlopen, Request
-    from urllib.error import URLError
+    from urllib.request import urlopen, Request, getproxies, proxy_bypass
+    from urllib.error import URLError, HTTPError
+    from urllib.parse import urlsplit, urljoin
+    import http.client as httplib
 else:
     import urllib2
-    from urllib2 import urlopen, Request, URLError
+    from urllib2 import urlopen, Request, URLError, HTTPError, getproxies
+    from urllib import proxy_bypass
+    from urlparse import urlsplit, urljoin
+    import httplib
 
 MAX_ATTEMPTS = 3
+MAX_REDIRECTS = 5
+
+def uses_proxy(url):
+    # Whether urllib would send url through a proxy - honours NO_PROXY
+    parts = urlsplit(url)
+    if not getproxies().get(parts.scheme.lower()):
+        return False
+    try:
+        return not proxy_bypass(parts.hostname or "")
+    except Exception:
+        return True
+
+class PooledResponse:
+    """
+    Wraps an http.client response so it can be used like the object returned
+    by urlopen. The connection goes back to the pool once the body has been
+    read to the end.
+    """
+    def __init__(self, pool, key, connection, response, url):
+        self.pool = pool
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.url = url
+        self.released = False
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def getcode(self):
+        return self.response.status
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.response.msg
+
+    def getheader(self, name, default=None):
+        return self.response.getheader(name, default)
+
+    def read(self, amt=None):
+        data = self.response.read() if amt is None else self.response.read(amt)
+        if self.response.isclosed():
+            self._release()
+        return data
+
+    def _release(self):
+        if self.released:
+            return
+        self.released = True
+        if self.response.isclosed() and not self.response.will_close:
+            self.pool.release(self.key, self.connection)
+        else:
+            self.connection.close()
+
+    def close(self):
+        if not self.released:
+            if not self.response.isclosed():
+                # Body was not read to the end - the connection can't be reused
+                self.response.close()
+                self.connection.close()
+                self.released = True
+                return
+            self._release()
+
+class ConnectionPool:
+    """
+    Keeps idle keep-alive connections per (scheme, host, port) so repeated
+    requests to the same host skip the TCP and TLS handshakes.
+    """
+    def __init__(self, pool_size=4, timeout=10):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _new_connection(self, key, ssl_context, timeout):
+        scheme, host, port = key[:3]
+        with self.lock:
+            self.created += 1
+        if scheme == "https":
+            return httplib.HTTPSConnection(host, port, timeout=timeout, context=ssl_context)
+        return httplib.HTTPConnection(host, port, timeout=timeout)
+
+    def acquire(self, key, ssl_context=None, timeout=None):
+        timeout = timeout if timeout is not None else self.timeout
+        with self.lock:
+            connections = self.idle.get(key)
+            connection = connections.pop() if connections else None
+            if connection is not None:
+                self.reused += 1
+        if connection is None:
+            return self._new_connection(key, ssl_context, timeout), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def release(self, key, connection):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.pool_size:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def request(self, url, headers=None, ssl_context=None, timeout=None, method="GET"):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            scheme = parts.scheme.lower()
+            if scheme not in ("http", "https"):
+                raise URLError("Unsupported URL scheme: {}".format(parts.scheme))
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname, port, id(ssl_context) if scheme == "https" else None)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            request_headers = dict(headers or {})
+            request_headers.setdefault("Host", parts.netloc.rsplit("@", 1)[-1])
+            request_headers.setdefault("Connection", "keep-alive")
+
+            response = None
+            connection, reused = self.acquire(key, ssl_context, timeout)
+            try:
+                connection.request(method, path, headers=request_headers)
+                response = connection.getresponse()
+            except (httplib.HTTPException, ConnectionError, BrokenPipeError) as e:
+                connection.close()
+                if not reused:
+                    raise URLError(e)
+                # The server dropped an idle keep-alive connection - retry once on a fresh one
+                connection = self._new_connection(key, ssl_context, timeout if timeout is not None else self.timeout)
+                try:
+                    connection.request(method, path, headers=request_headers)
+                    response = connection.getresponse()
+                except Exception:
+                    connection.close()
+                    raise
+            except Exception:
+                connection.close()
+                raise
+
+            pooled_response = PooledResponse(self, key, connection, response, url)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                location = urljoin(url, response.getheader("Location"))
+                # Drain the redirect body so the connection can be reused
+                pooled_response.read()
+                pooled_response.close()
+                if response.status == 303:
+                    method = "GET"
+                url = location
+                if uses_proxy(url):
+                    # Redirected to a host that has to go through the proxy
+                    return urlopen(Request(url, headers=headers or {}), timeout=timeout if timeout is not None else self.timeout, context=ssl_context)
+                continue
+            if response.status >= 400:
+                # Callers rarely close error bodies - read it here so the
+                # connection goes back to the pool (or is closed) right away
+                try:
+                    body = pooled_response.read()
+                except Exception:
+                    body = b""
+                pooled_response.close()
+                raise HTTPError(url, response.status, response.reason, response.msg, BytesIO(body))
+            return pooled_response
+
+        raise URLError("Too many redirects: {}".format(url))
+
+    def close(self):
+        with self.lock:
+            connections = [connection for idle in self.idle.values() for connection in idle]
+            self.idle = {}
+        for connection in connections:
+            connection.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "created": self.created,
+                "reused": self.reused
+            }
+
+class DownloadProgressTracker:
+    """
+    Aggregates the progress of several concurrent downloads into a single
+    source on the progress channel.
+    """
+    def __init__(self, progress_channel_instance, utils_instance=None, source="downloads"):
+        self.progress_channel = progress_channel_instance
+        self.utils = utils_instance if utils_instance else utils.Utils()
+        self.source = source
+        self.transfers = {}
+        self.lock = threading.Lock()
+
+    def get_callback(self, name):
+        def callback(bytes_downloaded, total_size):
+            self.update(name, bytes_downloaded, total_size)
+        return callback
+
+    def _totals(self):
+        bytes_downloaded = sum(downloaded for downloaded, _ in self.transfers.values())
+        total_size = sum(total for _, total in self.transfers.values())
+        if not all(total for _, total in self.transfers.values()):
+            total_size = 0
+        active = sum(1 for downloaded, total in self.transfers.values() if not total or downloaded < total)
+        return bytes_downloaded, total_size, active
+
+    def update(self, name, bytes_downloaded, total_size):
+        with self.lock:
+            self.transfers[name] = (bytes_downloaded, total_size or 0)
+            bytes_downloaded, total_size, active = self._totals()
+        self.progress_channel.publish(self.source, bytes_downloaded, total_size, message="{} active".format(active))
+
+    def finish(self):
+        with self.lock:
+            if not self.transfers:
+                return
+            bytes_downloaded, total_size, _ = self._totals()
+            count = len(self.transfers)
+        self.progress_channel.publish(self.source, bytes_downloaded, total_size, done=True)
+        self.utils.log_message("[收集文件] Downloaded {} files, {:.1f}MB".format(count, bytes_downloaded/(1024*1024)), level="INFO", to_build_log=True)
 
 class ResourceFetcher:
-    def __init__(self, utils_instance=None, integrity_checker_instance=None, headers=None):
+    def __init__(self, utils_instance=None, integrity_checker_instance=None, headers=None, pool_size=4, timeout=10, metadata_cache_instance=None, metadata_cache_ttl=600, progress_channel_instance=None, mirror_manager_instance=None):
         self.request_headers = headers or {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
         }
         self.utils = utils_instance if utils_instance else utils.Utils()
         self.buffer_size = 16 * 1024
         self.ssl_context = self.create_ssl_context()
+        self.unverified_ssl_context = ssl._create_unverified_context()
+        # Shared by everything that goes through this fetcher (Github, gatheringFiles, Updater)
+        self.connection_pool = ConnectionPool(pool_size=pool_size, timeout=timeout)
+        # Download progress goes here instead of the log - see progress_channel
+        self.progress_channel = progress_channel_instance if progress_channel_instance else progress_channel.ProgressChannel()
         self.integrity_checker = integrity_checker_instance if integrity_checker_instance else integrity_checker.IntegrityChecker()
+        self.metadata_cache = metadata_cache_instance if metadata_cache_instance else metadata_cache.MetadataCache(utils_instance=self.utils, ttl=metadata_cache_ttl)
+        # Picks (and races) the mirrors GitHub URLs are downloaded from
+        self.mirror_manager = mirror_manager_instance if mirror_manager_instance else mirror_manager.MirrorManager(utils_instance=self.utils)
 
     def create_ssl_context(self):
         try:
@@ -42,38 +291,206 @@ class ResourceFetcher:
             self.utils.log_message("[收集文件] Created unverified SSL context", level="INFO")
         return ssl_context
 
-    def _make_request(self, resource_url, timeout=10):
+    def open_url(self, resource_url, headers=None, timeout=None, verify=True):
+        """
+        Opens resource_url through the connection pool and returns a
+        urlopen-like response. Unlike _make_request, errors are raised.
+        """
+        request_headers = dict(self.request_headers)
+        request_headers.update(headers or {})
+        ssl_context = self.ssl_context if verify else self.unverified_ssl_context
+        timeout = timeout if timeout is not None else self.connection_pool.timeout
+
+        if uses_proxy(resource_url):
+            # Let urllib deal with the configured proxy
+            return urlopen(Request(resource_url, headers=request_headers), timeout=timeout, context=ssl_context)
+
+        return self.connection_pool.request(resource_url, headers=request_headers, ssl_context=ssl_context, timeout=timeout)
+
+    def open_mirrored(self, resource_url, headers=None, timeout=None, verify=True, exclude=(), race=True):
+        """
+        Like open_url, but resource_url is fetched from whichever of its
+        mirrors answers first. The response's mirror attribute tells which one.
+        race=False only opens the best ranked mirror - for small requests a
+        second connection costs more than it can win.
+        """
+        def opener(mirror_url, extra_headers=None):
+            request_headers = dict(headers or {})
+            request_headers.update(extra_headers or {})
+            return self.open_url(mirror_url, headers=request_headers, timeout=timeout, verify=verify)
+
+        return self.mirror_manager.race(resource_url, opener, exclude, race_width=None if race else 1)
+
+    def probe_mirrors(self, resource_url, force=False):
+        # Measures the mirrors of resource_url once, unless they were measured recently
+        if not force and not self.mirror_manager.needs_probe(resource_url):
+            return
+        self.mirror_manager.probe(resource_url, lambda mirror_url, headers=None: self.open_url(mirror_url, headers=dict(headers or {}, **{"Accept-Encoding": "identity"})))
+
+    def _make_request(self, resource_url, timeout=10, headers=None):
         try:
-            headers = dict(self.request_headers)
-            headers["Accept-Encoding"] = "gzip, deflate"
+            request_headers = {"Accept-Encoding": "gzip, deflate"}
+            request_headers.update(headers or {})
             
-            return urlopen(Request(resource_url, headers=headers), timeout=timeout, context=self.ssl_context)
-        except socket.timeout as e:
+            # Metadata and API requests are small - a failed mirror is ranked
+            # down and the retry in fetch_and_parse_content picks the next one
+            return self.open_mirrored(resource_url, headers=request_headers, timeout=timeout, race=False)
+        except HTTPError as e:
+            if e.code == 304:
+                # urlopen reports "Not Modified" as an error
+                return e
+            self._log_request_error(e)
+        except Exception as e:
+            self._log_request_error(e)
+
+        return None
+
+    def _log_request_error(self, e):
+        if isinstance(e, socket.timeout):
             self.utils.log_message("[收集文件] Timeout error: {}".format(e), level="ERROR", to_build_log=True)
-        except ssl.SSLError as e:
+        elif isinstance(e, ssl.SSLError):
             self.utils.log_message("[收集文件] SSL error: {}".format(e), level="ERROR", to_build_log=True)
-        except (URLError, socket.gaierror) as e:
+        elif isinstance(e, (URLError, socket.gaierror)):
             self.utils.log_message("[收集文件] Connection error: {}".format(e), level="ERROR", to_build_log=True)
-        except Exception as e:
+        else:
             self.utils.log_message("[收集文件] Request failed: {}".format(e), level="ERROR", to_build_log=True)
 
-        return None
+    def _get_partial_paths(self, destination_path):
+        # Partial data and the sidecar state used to resume it
+        return destination_path + ".part", destination_path + ".part.json"
 
-    def fetch_and_parse_content(self, resource_url, content_type=None):
+    def open_resumable_download(self, resource_url, destination_path, headers=None, timeout=None, verify=True, exclude=()):
+        """
+        Opens resource_url for downloading into destination_path. If an earlier
+        attempt left a partial file, asks the server for the remaining bytes
+        only (Range + If-Range) and appends to it - possibly from another
+        mirror than before. exclude - mirrors not to use.
+
+        Returns (response, local_file, bytes_already_downloaded, total_size).
+        Call finish_resumable_download once the response has been read.
+        """
+        part_path, state_path = self._get_partial_paths(destination_path)
+        request_headers = {"Accept-Encoding": "identity"}
+        request_headers.update(headers or {})
+
+        offset = 0
+        state = None
+        try:
+            state = self.utils.read_file(state_path)
+        except Exception:
+            pass
+        origin_url = self.mirror_manager.get_origin_url(resource_url)
+        if isinstance(state, dict) and state.get("url") == origin_url and os.path.exists(part_path):
+            # If-Range only accepts strong ETags
+            validator = state.get("etag")
+            if not validator or validator.startswith("W/"):
+                validator = state.get("last_modified")
+            offset = os.path.getsize(part_path) if validator else 0
+            if offset:
+                request_headers["Range"] = "bytes={}-".format(offset)
+                request_headers["If-Range"] = validator
+
+        try:
+            response = self.open_mirrored(resource_url, headers=request_headers, timeout=timeout, verify=verify, exclude=exclude)
+        except HTTPError as e:
+            if e.code == 416 and offset:
+                # The partial file doesn't match the remote file anymore
+                self.discard_resumable_download(destination_path)
+                return self.open_resumable_download(resource_url, destination_path, headers, timeout, verify, exclude)
+            raise
+
+        content_range = response.getheader("Content-Range") or ""
+        if offset and response.getcode() == 206 and content_range.startswith("bytes {}-".format(offset)):
+            mode = "ab"
+            self.utils.log_message("[收集文件] Resuming download of {} at {:.1f}MB".format(resource_url, offset/(1024*1024)), level="INFO", to_build_log=True)
+        else:
+            if offset:
+                self.utils.log_message("[收集文件] Server did not accept the resume request, restarting download of {}".format(resource_url), level="INFO", to_build_log=True)
+            offset = 0
+            mode = "wb"
+
+        total_size = None
+        if mode == "ab" and "/" in content_range and not content_range.endswith("/*"):
+            total_size = int(content_range.rsplit("/", 1)[1])
+        elif response.getheader("Content-Length"):
+            total_size = offset + int(response.getheader("Content-Length"))
+
+        self.utils.write_file(state_path, {
+            "url": origin_url,
+            "etag": response.getheader("ETag"),
+            "last_modified": response.getheader("Last-Modified"),
+            "total_size": total_size,
+            # http.client raises IncompleteRead when a chunked body is cut short,
+            # so one that was read to the end is complete even without a length
+            "chunked": "chunked" in (response.getheader("Transfer-Encoding") or "").lower()
+        })
+
+        return response, open(part_path, mode), offset, total_size
+
+    def finish_resumable_download(self, destination_path, total_size=None, sha256_hash=None, downloaded_hash=None):
+        """
+        Moves a completely downloaded file into place. Returns False (and keeps
+        the partial file for the next attempt) if bytes are still missing.
+        Without a total_size (no Content-Length) the file is complete when
+        downloaded_hash matches sha256_hash, or when the chunked body ended
+        cleanly. A body delimited only by the connection closing can't be told
+        apart from a dropped connection - it is accepted as before, with a warning.
+        """
+        part_path, state_path = self._get_partial_paths(destination_path)
+        if not os.path.exists(part_path):
+            return False
+        if total_size:
+            if os.path.getsize(part_path) != total_size:
+                return False
+        elif sha256_hash and downloaded_hash:
+            if downloaded_hash.lower() != sha256_hash.lower():
+                return False
+        else:
+            state = None
+            try:
+                state = self.utils.read_file(state_path)
+            except Exception:
+                pass
+            if not (isinstance(state, dict) and state.get("chunked")):
+                self.utils.log_message("[收集文件] The server sent no length for {}, assuming the download is complete".format(os.path.basename(destination_path)), level="WARNING", to_build_log=True)
+        os.replace(part_path, destination_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return True
+
+    def discard_resumable_download(self, destination_path):
+        for path in self._get_partial_paths(destination_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def fetch_and_parse_content(self, resource_url, content_type=None, max_age=None):
+        """
+        max_age - seconds a cached copy is used without contacting the server
+        (defaults to the metadata cache TTL, 0 always revalidates).
+        """
         attempt = 0
         response = None
 
+        cached_entry = self.metadata_cache.get(resource_url)
+        if self.metadata_cache.is_fresh(cached_entry, max_age):
+            parsed = self._parse_content(cached_entry["content"], content_type, log_errors=False)
+            if parsed is not None:
+                self.metadata_cache.hits += 1
+                self.utils.log_message("[收集文件] Using cached content for {}".format(resource_url), level="INFO")
+                return parsed
+
         self.utils.log_message("[收集文件] Fetching and parsing content from {}".format(resource_url), level="INFO")
 
+        conditional_headers = self.metadata_cache.get_conditional_headers(cached_entry)
         while attempt < MAX_ATTEMPTS:
-            response = self._make_request(resource_url)
+            response = self._make_request(resource_url, headers=conditional_headers)
 
             if not response:
                 attempt += 1
                 self.utils.log_message("[收集文件] Failed to fetch content from {}. Retrying...".format(resource_url), level="WARNING", to_build_log=True)
                 continue
 
-            if response.getcode() == 200:
+            if response.getcode() in (200, 304):
                 break
 
             attempt += 1
@@ -81,7 +498,16 @@ class ResourceFetcher:
         if not response:
             self.utils.log_message("[收集文件] Failed to fetch content from {}".format(resource_url), level="ERROR", to_build_log=True)
             return None
-        
+
+        if response.getcode() == 304 and cached_entry:
+            response.read()
+            response.close()
+            self.metadata_cache.revalidated += 1
+            self.metadata_cache.touch(cached_entry)
+            self.utils.log_message("[收集文件] {} not modified, using cached content".format(resource_url), level="INFO")
+            return self._parse_content(cached_entry["content"], content_type)
+
+        self.metadata_cache.misses += 1
         content = response.read()
 
         if response.info().get("Content-Encoding") == "gzip" or content.startswith(b"\x1f\x8b"):
@@ -94,7 +520,14 @@ class ResourceFetcher:
                 content = zlib.decompress(content)
             except Exception as e:
                 self.utils.log_message("[收集文件] Failed to decompress deflate content: {}".format(e), level="ERROR", to_build_log=True)
-        
+
+
+        parsed = self._parse_content(content, content_type)
+        if parsed is not None and response.getcode() == 200:
+            self.metadata_cache.put(resource_url, content, response.info().get("ETag"), response.info().get("Last-Modified"))
+        return parsed
+
+    def _parse_content(self, content, content_type=None, log_errors=True):
         try:
             if content_type == "json":
                 return json.loads(content)
@@ -103,84 +536,91 @@ class ResourceFetcher:
             else:
                 return content.decode("utf-8")
         except Exception as e:
-            self.utils.log_message("[收集文件] Error parsing content as {}: {}".format(content_type, e), level="ERROR", to_build_log=True)
+            if log_errors:
+                self.utils.log_message("[收集文件] Error parsing content as {}: {}".format(content_type, e), level="ERROR", to_build_log=True)
             
         return None
 
-    def _download_with_progress(self, response, local_file):
-        total_size = response.getheader("Content-Length")
-        if total_size:
-            total_size = int(total_size)
-        bytes_downloaded = 0
-        start_time = time.time()
-        last_time = start_time
-        last_bytes = 0
-        speeds = []
-
-        speed_str = "-- KB/s"
+    def _download_with_progress(self, response, local_file, progress_callback=None, bytes_downloaded=0, total_size=None, sha256=None, source=None):
+        # Hashes every chunk as it is written and returns the SHA256 of the
+        # whole file, so it never has to be read back for verification.
+        # Pass sha256 already fed with any bytes downloaded earlier.
+        if sha256 is None:
+            sha256 = self.integrity_checker.get_sha256_hasher()
+        if total_size is None:
+            total_size = response.getheader("Content-Length")
+            if total_size:
+                total_size = int(total_size) + bytes_downloaded
+        source = source or os.path.basename(local_file.name)
         
         while True:
             chunk = response.read(self.buffer_size)
             if not chunk:
                 break
             local_file.write(chunk)
+            sha256.update(chunk)
             bytes_downloaded += len(chunk)
-            
-            current_time = time.time()
-            time_diff = current_time - last_time
-            
-            if time_diff > 0.5:
-                current_speed = (bytes_downloaded - last_bytes) / time_diff
-                speeds.append(current_speed)
-                if len(speeds) > 5:
-                    speeds.pop(0)
-                avg_speed = sum(speeds) / len(speeds)
-                
-                if avg_speed < 1024*1024:
-                    speed_str = "{:.1f} KB/s".format(avg_speed/1024)
-                else:
-                    speed_str = "{:.1f} MB/s".format(avg_speed/(1024*1024))
-                
-                last_time = current_time
-                last_bytes = bytes_downloaded
-            
-            if total_size:
-                percent = int(bytes_downloaded / total_size * 100)
-                bar_length = 40
-                filled = int(bar_length * bytes_downloaded / total_size)
-                bar = "█" * filled + "░" * (bar_length - filled)
-                progress = "{} [{}] {:3d}% {:.1f}/{:.1f}MB".format(speed_str, bar, percent, bytes_downloaded/(1024*1024), total_size/(1024*1024))
+
+            if progress_callback:
+                # The caller aggregates and reports progress itself
+                progress_callback(bytes_downloaded, total_size)
             else:
-                progress = "{} {:.1f}MB downloaded".format(speed_str, bytes_downloaded/(1024*1024))
-            
-            self.utils.log_message("[收集文件] Download progress: {}".format(progress), level="INFO", to_build_log=True)
+                self.progress_channel.publish(source, bytes_downloaded, total_size)
+
+        if not progress_callback:
+            self.progress_channel.publish(source, bytes_downloaded, total_size, done=True)
+
+        return sha256.hexdigest()
 
-    def download_and_save_file(self, resource_url, destination_path, sha256_hash=None):
+    def download_and_save_file(self, resource_url, destination_path, sha256_hash=None, progress_callback=None, headers=None, verify=True):
         attempt = 0
 
         self.utils.log_message("[收集文件] Downloading and saving file from {} to {}".format(resource_url, destination_path), level="INFO")
 
+        # Mirrors that failed this download - the next attempt resumes from another one
+        failed_mirrors = set()
         while attempt < MAX_ATTEMPTS:
             attempt += 1
-            response = self._make_request(resource_url)
-
-            if not response:
+            try:
+                response, local_file, bytes_downloaded, total_size = self.open_resumable_download(resource_url, destination_path, headers=headers, verify=verify, exclude=failed_mirrors)
+            except Exception as e:
+                self._log_request_error(e)
                 self.utils.log_message("[收集文件] Failed to fetch content from {}. Retrying...".format(resource_url), level="WARNING", to_build_log=True)
                 continue
 
-            with open(destination_path, "wb") as local_file:
-                self._download_with_progress(response, local_file)
+            mirror = getattr(response, "mirror", None)
+            start_time = time.time()
+            downloaded_hash = None
+            bytes_received = 0
+            try:
+                with local_file:
+                    sha256 = self.integrity_checker.get_sha256_hasher(local_file.name if bytes_downloaded else None)
+                    downloaded_hash = self._download_with_progress(response, local_file, progress_callback, bytes_downloaded, total_size, sha256, source=os.path.basename(destination_path))
+                    bytes_received = local_file.tell() - bytes_downloaded
+            except Exception as e:
+                self.utils.log_message("[收集文件] Download of {} interrupted: {}".format(resource_url, e), level="WARNING", to_build_log=True)
+                self._fail_mirror(resource_url, mirror, failed_mirrors)
+            finally:
+                response.close()
+
+            if downloaded_hash and bytes_received and time.time() > start_time:
+                self.mirror_manager.record(resource_url, mirror, throughput=bytes_received / (time.time() - start_time))
+
+            if not (downloaded_hash and self.finish_resumable_download(destination_path, total_size, sha256_hash, downloaded_hash)):
+                if attempt < MAX_ATTEMPTS:
+                    self.utils.log_message("[收集文件] Download incomplete for {}. Resuming...".format(resource_url), level="WARNING", to_build_log=True)
+                continue
 
             if os.path.exists(destination_path) and os.path.getsize(destination_path) > 0:
                 if sha256_hash:
                     self.utils.log_message("[收集文件] Verifying SHA256 checksum...", level="INFO", to_build_log=True)
-                    downloaded_hash = self.integrity_checker.get_sha256(destination_path)
                     if downloaded_hash.lower() == sha256_hash.lower():
                         self.utils.log_message("[收集文件] Checksum verified successfully.", level="INFO", to_build_log=True)
                         return True
                     else:
                         self.utils.log_message("[收集文件] Checksum mismatch! Removing file and retrying download...", level="WARNING", to_build_log=True)
                         os.remove(destination_path)
+                        self._fail_mirror(resource_url, mirror, failed_mirrors)
                         continue
                 else:
                     self.utils.log_message("[收集文件] No SHA256 hash provided. Downloading file without verification.", level="INFO", to_build_log=True)
@@ -193,4 +633,11 @@ class ResourceFetcher:
                 self.utils.log_message("[收集文件] Download failed for {}. Retrying...".format(resource_url), level="WARNING", to_build_log=True)
 
         self.utils.log_message("[收集文件] Failed to download {} after {} attempts.".format(resource_url, MAX_ATTEMPTS), level="ERROR", to_build_log=True)
-        return False
\ No newline at end of file
+        return False
+
+    def _fail_mirror(self, resource_url, mirror, failed_mirrors):
+        if mirror is None:
+            return
+        failed_mirrors.add(mirror)
+        self.mirror_manager.record(resource_url, mirror, failed=True)
+        self.utils.log_message("[收集文件] Mirror {} failed for {}, switching to another mirror".format(mirror, resource_url), level="WARNING", to_build_log=True)
\ No newline at end of file
@@ -1,79 +1,125 @@
 # Source: https://github.com/corpnewt/SSDTTime/blob/7b3fb78112bf320a1bc6a7e50dddb2b375cb70b0/Scripts/run.py
 
-import sys, subprocess, time, threading, shlex
+import sys, os, io, codecs, subprocess, threading, shlex
 try:
-    from Queue import Queue, Empty
+    import selectors
+except ImportError:
+    selectors = None
+try:
+    from Queue import Queue
 except:
-    from queue import Queue, Empty
+    from queue import Queue
 
 ON_POSIX = 'posix' in sys.builtin_module_names
+CHUNK_SIZE = 65536
+
+class _OutputStream:
+    # Decodes raw chunks read from one pipe, echoes them to the console (if
+    # any) and hands complete lines to the optional callback
+
+    def __init__(self, name, console, callback = None):
+        self.name = name
+        self.console = console
+        self.callback = callback
+        self.decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="ignore"), translate=True)
+        self.chunks = []
+        self.pending = ""
+
+    def feed(self, data, final = False):
+        text = self.decoder.decode(data, final=final)
+        if text:
+            if self.console:
+                self.console.write(text)
+                self.console.flush()
+            self.chunks.append(text)
+        if not self.callback:
+            return
+        self.pending += text
+        if "\n" in self.pending:
+            lines = self.pending.split("\n")
+            self.pending = lines.pop()
+            for line in lines:
+                self.callback(line, self.name)
+        if final and self.pending:
+            self.callback(self.pending, self.name)
+            self.pending = ""
+
+    def get_output(self):
+        return "".join(self.chunks)
 
 class Run:
 
     def __init__(self):
         return
 
-    def _read_output(self, pipe, q):
+    def _read_output(self, pipe, q, stream):
+        # Reads whatever is available (up to CHUNK_SIZE) instead of a byte at a time
         try:
-            for line in iter(lambda: pipe.read(1), b''):
-                q.put(line)
-        except ValueError:
+            for chunk in iter(lambda: os.read(pipe.fileno(), CHUNK_SIZE), b''):
+                q.put((stream, chunk))
+        except (OSError, ValueError):
             pass
+        q.put((stream, None))
         pipe.close()
 
-    def _create_thread(self, output):
-        # Creates a new queue and thread object to watch based on the output pipe sent
-        q = Queue()
-        t = threading.Thread(target=self._read_output, args=(output, q))
+    def _create_thread(self, output, q, stream):
+        # Creates a new thread object to watch the output pipe sent - all threads share one queue
+        t = threading.Thread(target=self._read_output, args=(output, q, stream))
         t.daemon = True
-        return (q,t)
+        return t
+
+    def _pump_selectors(self, p, streams):
+        # POSIX - wait on both pipes at once and read them as data arrives
+        sel = selectors.DefaultSelector()
+        try:
+            for pipe, stream in zip((p.stdout, p.stderr), streams):
+                sel.register(pipe, selectors.EVENT_READ, stream)
+            while sel.get_map():
+                for key, _ in sel.select():
+                    chunk = os.read(key.fd, CHUNK_SIZE)
+                    if not chunk:
+                        sel.unregister(key.fileobj)
+                        key.data.feed(b"", final=True)
+                        continue
+                    key.data.feed(chunk)
+        finally:
+            sel.close()
 
-    def _stream_output(self, comm, shell = False):
-        output = error = ""
+    def _pump_threads(self, p, streams):
+        # Windows can't select() on pipes - fall back to one reader thread per pipe
+        q = Queue()
+        threads = [self._create_thread(pipe, q, stream) for pipe, stream in zip((p.stdout, p.stderr), streams)]
+        for t in threads:
+            t.start()
+        open_streams = len(threads)
+        while open_streams:
+            stream, chunk = q.get()
+            if chunk is None:
+                open_streams -= 1
+                stream.feed(b"", final=True)
+                continue
+            stream.feed(chunk)
+
+    def _stream_output(self, comm, shell = False, callback = None, echo = True):
+        streams = (_OutputStream("stdout", sys.stdout if echo else None, callback), _OutputStream("stderr", sys.stderr if echo else None, callback))
         p = None
         try:
             if shell and type(comm) is list:
                 comm = " ".join(shlex.quote(x) for x in comm)
             if not shell and type(comm) is str:
                 comm = shlex.split(comm)
-            p = subprocess.Popen(comm, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0, universal_newlines=True, close_fds=ON_POSIX)
-            # Setup the stdout thread/queue
-            q,t   = self._create_thread(p.stdout)
-            qe,te = self._create_thread(p.stderr)
-            # Start both threads
-            t.start()
-            te.start()
-
-            while True:
-                c = z = ""
-                try: c = q.get_nowait()
-                except Empty: pass
-                else:
-                    sys.stdout.write(c)
-                    output += c
-                    sys.stdout.flush()
-                try: z = qe.get_nowait()
-                except Empty: pass
-                else:
-                    sys.stderr.write(z)
-                    error += z
-                    sys.stderr.flush()
-                if not c==z=="": continue # Keep going until empty
-                # No output - see if still running
-                p.poll()
-                if p.returncode != None:
-                    # Subprocess ended
-                    break
-                # No output, but subprocess still running - stall for 20ms
-                time.sleep(0.02)
-
-            o, e = p.communicate()
-            return (output+o, error+e, p.returncode)
+            p = subprocess.Popen(comm, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0, close_fds=ON_POSIX)
+            if ON_POSIX and selectors:
+                self._pump_selectors(p, streams)
+            else:
+                self._pump_threads(p, streams)
+            p.wait()
+            return (streams[0].get_output(), streams[1].get_output(), p.returncode)
         except:
             if p:
                 try: o, e = p.communicate()
                 except: o = e = ""
-                return (output+o, error+e, p.returncode)
+                return (streams[0].get_output()+self._decode(o), streams[1].get_output()+self._decode(e), p.returncode)
             return ("", "Command not found!", 1)
 
     def _decode(self, value, encoding="utf-8", errors="ignore"):
@@ -106,6 +152,7 @@ class Run:
             args   = comm.get("args",   [])
             shell  = comm.get("shell",  False)
             stream = comm.get("stream", False)
+            callback = comm.get("callback", None)
             sudo   = comm.get("sudo",   False)
             stdout = comm.get("stdout", False)
             stderr = comm.get("stderr", False)
@@ -131,9 +178,10 @@ class Run:
             if show:
                 print(" ".join(args))
 
-            if stream:
-                # Stream it!
-                out = self._stream_output(args, shell)
+            if stream or callback:
+                # Stream it! - the callback gets each line as (line, "stdout"/"stderr"),
+                # and only "stream" echoes to the console
+                out = self._stream_output(args, shell, callback, stream)
             else:
                 # Just run and gather output
                 out = self._run_command(args, shell)
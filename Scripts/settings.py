@@ -14,7 +14,9 @@ class Settings:
             "auto_update_check": True,
             "enable_debug_logging": False,
             "window_geometry": None,
-            "auto_check_sksp_updates": True
+            "auto_check_sksp_updates": True,
+            "metadata_cache_ttl": 600,
+            "download_mirrors": []
         }
 
         self.settings_file = self._get_settings_file_path()
@@ -184,7 +184,7 @@ class SMBIOS:
         
         items = []
         for index, device in enumerate(mac_devices):
-            is_supported = self.utils.parse_darwin_version(device.initial_support) <= self.utils.parse_darwin_version(macos_version) <= self.utils.parse_darwin_version(device.last_supported_version)
+            is_supported = macos_version in device.support_range
             
             platform_match = True
             if is_laptop and not device.name.startswith("MacBook"):
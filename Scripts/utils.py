@@ -1,4 +1,5 @@
 import os
+import io
 import json
 import plistlib
 import shutil
@@ -10,6 +11,7 @@ import tempfile
 import traceback
 import contextlib
 import logging
+from Scripts.darwin_version import DarwinVersion
 
 class Utils:
     def __init__(self):
@@ -52,10 +54,14 @@ class Utils:
     def get_temporary_dir(self):
         return tempfile.mkdtemp(prefix="ocs_")
 
-    def write_file(self, file_path, data):
+    def write_file(self, file_path, data, atomic=False):
+        # atomic: write a temporary file and rename it over file_path, so
+        # readers never see a partial file and hardlinks to the old file keep
+        # their content
         file_extension = os.path.splitext(file_path)[1]
+        target_path = file_path + ".tmp" if atomic else file_path
 
-        with open(file_path, "w" if file_extension == ".json" else "wb") as file:
+        with open(target_path, "w" if file_extension == ".json" else "wb") as file:
             if file_extension == ".json":
                 json.dump(data, file, indent=4)
             else:
@@ -64,6 +70,9 @@ class Utils:
 
                 file.write(data)
 
+        if atomic:
+            os.replace(target_path, file_path)
+
     def read_file(self, file_path):
         if not os.path.exists(file_path):
             return None
@@ -137,21 +146,47 @@ class Utils:
     def string_to_hex(self, string):
         return ''.join(format(ord(char), '02X') for char in string)
     
-    def extract_zip_file(self, zip_path, extraction_directory=None):
+    def extract_zip_file(self, zip_path, extraction_directory=None, member_filter=None):
         if extraction_directory is None:
             extraction_directory = os.path.splitext(zip_path)[0]
         
         os.makedirs(extraction_directory, exist_ok=True)
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extraction_directory)
+            if member_filter is None:
+                zip_ref.extractall(extraction_directory)
+            else:
+                self._extract_zip_members(zip_ref, extraction_directory, member_filter)
+
+    def _extract_zip_members(self, zip_ref, extraction_directory, member_filter, prefix=""):
+        # Only extracts the members member_filter accepts. Accepted nested zips are
+        # read from memory and expanded into a folder named after them, the same
+        # layout extracting them in place would give. member_filter is passed the
+        # member path relative to the outermost archive, nested folders included.
+        for info in zip_ref.infolist():
+            name = info.filename
+            parts = name.replace("\\", "/").split("/")
+            if name.startswith("/") or ".." in parts:
+                continue
+            path = prefix + name
+            if not member_filter(path):
+                continue
+            if not info.is_dir() and name.lower().endswith(".zip"):
+                with zipfile.ZipFile(io.BytesIO(zip_ref.read(info)), 'r') as nested_zip_ref:
+                    self._extract_zip_members(
+                        nested_zip_ref,
+                        os.path.join(extraction_directory, os.path.splitext(name)[0]),
+                        member_filter,
+                        prefix=os.path.splitext(path)[0] + "/"
+                    )
+                continue
+            zip_ref.extract(info, extraction_directory)
 
     def contains_any(self, data, search_item, start=0, end=None):
         return next((item for item in data[start:end] if item.lower() in search_item.lower()), None)
     
     def parse_darwin_version(self, darwin_version):
-        major, minor, patch = map(int, darwin_version.split('.'))
-        return major, minor, patch
+        return DarwinVersion.parse(darwin_version)
     
     def open_folder(self, folder_path):
         if os.name == 'posix':
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Scripts import resource_fetcher
+
+DATA = os.urandom(200000)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        if self.path.startswith("/chunked"):
+            # No Content-Length - the body is sent chunked
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            body = DATA if self.path == "/chunked" else DATA[:50000]
+            for start in range(0, len(body), 65536):
+                chunk = body[start:start + 65536]
+                self.wfile.write("{:x}\r\n".format(len(chunk)).encode() + chunk + b"\r\n")
+            if self.path == "/chunked":
+                self.wfile.write(b"0\r\n\r\n")
+        else:
+            # No Content-Length - the body ends when the connection closes
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(DATA)
+        self.close_connection = True
+
+class DownloadWithoutLengthTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = "http://127.0.0.1:{}".format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.fetcher = resource_fetcher.ResourceFetcher()
+        self.temp_dir = tempfile.mkdtemp()
+        self.destination_path = os.path.join(self.temp_dir, "file.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_destination(self):
+        with open(self.destination_path, "rb") as f:
+            return f.read()
+
+    def test_chunked_body_without_hash_is_complete(self):
+        self.assertTrue(self.fetcher.download_and_save_file(self.base_url + "/chunked", self.destination_path))
+        self.assertEqual(self.read_destination(), DATA)
+
+    def test_close_delimited_body_without_hash_is_accepted(self):
+        self.assertTrue(self.fetcher.download_and_save_file(self.base_url + "/closed", self.destination_path))
+        self.assertEqual(self.read_destination(), DATA)
+
+    def test_truncated_chunked_body_is_not_promoted(self):
+        self.assertFalse(self.fetcher.download_and_save_file(self.base_url + "/chunked-truncated", self.destination_path))
+        self.assertFalse(os.path.exists(self.destination_path))
+
+if __name__ == "__main__":
+    unittest.main()
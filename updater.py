@@ -7,8 +7,6 @@ import platform
 import tempfile
 import time
 import json
-import urllib.request
-import ssl
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
 from Scripts.custom_dialogs import show_update_dialog, show_info, show_confirmation
@@ -46,12 +44,7 @@ class Updater(QObject):
 
     def fetch_update_info(self):
         try:
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            req = urllib.request.Request(UPDATE_JSON_URL, headers={'User-Agent': 'SimpleKaruzi-Updater'})
-            with urllib.request.urlopen(req, context=ctx, timeout=10) as response:
+            with self.fetcher.open_url(UPDATE_JSON_URL, headers={'User-Agent': 'SimpleKaruzi-Updater'}, timeout=10, verify=False) as response:
                 data = json.loads(response.read().decode('utf-8'))
                 return data
         except Exception as e:
@@ -72,7 +65,13 @@ class Updater(QObject):
             if percent % 10 == 0:
                 self.u.log_message(f"[更新] {message}", level="INFO")
 
+        # 下载进度经 progress_channel 合并后再上报，避免每个数据块都发一次信号
+        def on_progress(event):
+            if event.source == "update_pkg":
+                report(event.percent, f"下载中... {event.speed / 1024 / 1024:.2f} MB/s")
+
         url = download_info.get("url")
+        expected_sha256 = download_info.get("sha256")
         if not url:
             raise Exception("下载地址无效")
 
@@ -81,39 +80,46 @@ class Updater(QObject):
             shutil.rmtree(temp_dir)
         os.makedirs(temp_dir)
         
-        zip_path = os.path.join(temp_dir, "update_pkg.zip")
+        # 更新包下载到单独的目录，中断后可以断点续传
+        download_dir = os.path.join(tempfile.gettempdir(), "SimpleKaruzi_Update_Download")
+        os.makedirs(download_dir, exist_ok=True)
+        zip_path = os.path.join(download_dir, "update_pkg.zip")
         
         report(0, "准备下载...")
         try:
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            req = urllib.request.Request(url, headers={'User-Agent': 'SimpleKaruzi-Updater'})
+            response, out_file, downloaded_size, total_size = self.fetcher.open_resumable_download(url, zip_path, headers={'User-Agent': 'SimpleKaruzi-Updater'}, timeout=30, verify=False)
+            total_size = total_size or 0
+            chunk_size = 8192 * 4
+            # 边下载边计算 SHA256
+            sha256 = self.fetcher.integrity_checker.get_sha256_hasher(out_file.name if downloaded_size else None)
+            self.fetcher.progress_channel.subscribe(on_progress)
             
-            with urllib.request.urlopen(req, context=ctx, timeout=30) as response:
-                total_size = int(response.info().get('Content-Length', 0))
-                downloaded_size = 0
-                chunk_size = 8192 * 4
-                start_time = time.time()
-                
-                with open(zip_path, 'wb') as out_file:
-                    while True:
-                        if cancel_callback and cancel_callback():
-                            raise Exception("用户取消")
-
-                        chunk = response.read(chunk_size)
-                        if not chunk:
-                            break
-                        out_file.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        percent = int(downloaded_size * 100 / total_size) if total_size > 0 else 0
-                        elapsed = time.time() - start_time
-                        speed = downloaded_size / (elapsed if elapsed > 0 else 1) / 1024 / 1024
-                        
-                        report(percent, f"下载中... {speed:.2f} MB/s")
+            with response, out_file:
+                while True:
+                    if cancel_callback and cancel_callback():
+                        raise Exception("用户取消")
+
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    out_file.write(chunk)
+                    sha256.update(chunk)
+                    downloaded_size += len(chunk)
+                    
+                    self.fetcher.progress_channel.publish("update_pkg", downloaded_size, total_size)
+            self.fetcher.progress_channel.publish("update_pkg", downloaded_size, total_size, done=True)
+
+            # 没有文件大小时由 finish_resumable_download 校验 SHA256
+            if not self.fetcher.finish_resumable_download(zip_path, total_size, expected_sha256, sha256.hexdigest()):
+                raise Exception("下载未完成，请重试以继续下载")
         except Exception as e:
             raise e
+        finally:
+            self.fetcher.progress_channel.unsubscribe(on_progress)
+
+        if total_size and expected_sha256 and sha256.hexdigest().lower() != expected_sha256.lower():
+            os.remove(zip_path)
+            raise Exception("更新包校验失败")
 
         # 2. 解压
         if cancel_callback and cancel_callback():
@@ -133,6 +139,7 @@ class Updater(QObject):
             raise Exception("未找到 SimpleKaruzi.app 或 .exe")
 
         self._fix_permissions(new_app_path)
+        os.remove(zip_path)
         report(100, "准备就绪")
         
         return new_app_path